@@ -0,0 +1,34 @@
+# Generated by Django 2.2 on 2026-10-18 10:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brand', '0119_auto_20220322_1058'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicenseBuyerSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('books_name', models.CharField(max_length=255, verbose_name='Books Name')),
+                ('customer_name', models.CharField(blank=True, max_length=255, null=True, verbose_name='Customer Name')),
+                ('summary', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=dict, null=True, verbose_name='Summary')),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True, verbose_name='Refreshed At')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('license', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buyer_summaries', to='brand.License', verbose_name='License')),
+            ],
+            options={
+                'verbose_name': 'License Buyer Summary',
+                'verbose_name_plural': 'License Buyer Summaries',
+                'unique_together': {('license', 'books_name')},
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brand', '0120_licensebuyersummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='licensebuyersummary',
+            name='dirty_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Invalidated At'),
+        ),
+    ]
@@ -908,3 +908,35 @@ class Sign(TimeStampFlagModelMixin,models.Model):
     request_id = models.CharField(_('Request ID'), blank=True, null=True, max_length=255)
     action_id = models.CharField(_('Action ID'), blank=True, null=True, max_length=255)
     fields = JSONField(null=True, blank=True, default=dict)
+
+
+class LicenseBuyerSummary(TimeStampFlagModelMixin, models.Model):
+    """
+    Materialized Zoho Books buyer summary for a license.
+    """
+    license = models.ForeignKey(
+        License,
+        verbose_name=_('License'),
+        related_name='buyer_summaries',
+        on_delete=models.CASCADE,
+    )
+    books_name = models.CharField(_('Books Name'), max_length=255)
+    customer_name = models.CharField(_('Customer Name'), blank=True, null=True, max_length=255)
+    summary = JSONField(_('Summary'), null=True, blank=True, default=dict)
+    refreshed_at = models.DateTimeField(_('Refreshed At'), blank=True, null=True)
+    dirty_at = models.DateTimeField(_('Invalidated At'), blank=True, null=True)
+    error = models.TextField(_('Error'), blank=True, null=True)
+
+    def __str__(self):
+        return f'{self.license} | {self.books_name}'
+
+    @property
+    def is_stale(self):
+        if not self.refreshed_at or self.dirty_at:
+            return True
+        return self.refreshed_at < timezone.now() - timedelta(seconds=settings.BUYER_SUMMARY_MAX_AGE)
+
+    class Meta:
+        unique_together = (('license', 'books_name'), )
+        verbose_name = _('License Buyer Summary')
+        verbose_name_plural = _('License Buyer Summaries')
@@ -21,6 +21,7 @@ from inventory.models import (Documents, )
 from integration.crm import (insert_records,is_user_existing,)
 from integration.box import upload_file
 from integration.apps.aws import (create_presigned_url, )
+from core.mixins.serializers import (DocumentURLListSerializer, DocumentURLSerializerMixin, )
 from integration.tasks import (
     update_in_crm_task,
     update_license_task,
@@ -121,28 +122,19 @@ class OrganizationSerializer(serializers.ModelSerializer):
         return updated_instance
 
 
-class BrandSerializer(NestedModelSerializer, serializers.ModelSerializer):
+class BrandSerializer(DocumentURLSerializerMixin, NestedModelSerializer, serializers.ModelSerializer):
     """
     This defines Brand serializer.
     """
     document_url = serializers.SerializerMethodField()
     brand_image = serializers.SerializerMethodField()
+    document_types = ('profile_image',)
 
     def get_document_url(self, obj):
         """
         Return s3 document url.
         """
-        try:
-            document = Documents.objects.filter(object_id=obj.id, doc_type='profile_image').latest('created_on')
-            if document.box_url:
-                return document.box_url
-            else:
-                path = document.path
-                url = create_presigned_url(AWS_BUCKET, path)
-                if url.get('response'):
-                    return url.get('response')
-        except Exception:
-            return None
+        return self.get_cached_document_url(obj, 'profile_image')
 
     def get_brand_image(self,obj):
         """
@@ -166,12 +158,14 @@ class BrandSerializer(NestedModelSerializer, serializers.ModelSerializer):
     class Meta:
         model = Brand
         exclude = ('organization',)
+        list_serializer_class = DocumentURLListSerializer
 
 
-class LicenseSerializer(NestedModelSerializer, serializers.ModelSerializer):
+class LicenseSerializer(DocumentURLSerializerMixin, NestedModelSerializer, serializers.ModelSerializer):
     """
     This defines license serializer.
     """
+    document_types = ('profile_image', 'license', 'seller_permit')
     license_url = serializers.SerializerMethodField()
     seller_permit_url = serializers.SerializerMethodField()
     license_profile_url = serializers.SerializerMethodField()
@@ -200,49 +194,19 @@ class LicenseSerializer(NestedModelSerializer, serializers.ModelSerializer):
         """
         Return s3 license url.
         """
-        try:
-            document = Documents.objects.filter(object_id=obj.id, doc_type='profile_image').latest('created_on')
-            if document.box_url:
-                return document.box_url
-            else:
-                path = document.path
-                url = create_presigned_url(AWS_BUCKET, path)
-                if url.get('response'):
-                    return url.get('response')
-        except Exception:
-            return None
-    
+        return self.get_cached_document_url(obj, 'profile_image')
+
     def get_license_url(self, obj):
         """
         Return s3 license url.
         """
-        try:
-            license = Documents.objects.filter(object_id=obj.id, doc_type='license').latest('created_on')
-            if license.box_url:
-                return license.box_url
-            else:
-                path = license.path
-                url = create_presigned_url(AWS_BUCKET, path)
-                if url.get('response'):
-                    return url.get('response')
-        except Exception:
-            return None
+        return self.get_cached_document_url(obj, 'license')
 
     def get_seller_permit_url(self, obj):
         """
         Return s3 license url.
         """
-        try:
-            seller = Documents.objects.filter(object_id=obj.id, doc_type='seller_permit').latest('created_on')
-            if seller.box_url:
-                return seller.box_url
-            else:
-                path = seller.path
-                url = create_presigned_url(AWS_BUCKET, path)
-                if url.get('response'):
-                    return url.get('response')
-        except Exception:
-            return None
+        return self.get_cached_document_url(obj, 'seller_permit')
 
     def validate(self, attrs):
         if self.context['view'].action == 'create':
@@ -301,6 +265,7 @@ class LicenseSerializer(NestedModelSerializer, serializers.ModelSerializer):
 
     class Meta:
         model = License
+        list_serializer_class = DocumentURLListSerializer
         # fields = ('__all__')
         read_only_fields = (
             'approved_on',
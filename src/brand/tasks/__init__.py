@@ -45,6 +45,12 @@ from .create_customer_in_books import (
 from .refresh_integration_ids import (
     refresh_integration_ids_task,
 )
+from .buyer_summary import (
+    refresh_license_buyer_summary,
+    queue_license_buyer_summary_refresh,
+    refresh_license_buyer_summary_task,
+    refresh_stale_buyer_summaries_task,
+)
 slack = Slacker(settings.SLACK_TOKEN)
 
 
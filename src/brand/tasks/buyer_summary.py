@@ -0,0 +1,111 @@
+"""
+Materialized buyer summary tasks.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q
+from django.utils import timezone
+from celery.task import periodic_task
+from celery.schedules import crontab
+
+from core.cache import (get_redis_connection, )
+from core.celery import app
+from integration.books import (get_buyer_summary, )
+from ..models import (
+    License,
+    LicenseBuyerSummary,
+)
+
+
+def get_buyer_summary_customer_name(license_obj):
+    """
+    Return Zoho Books customer name for license.
+    """
+    try:
+        return license_obj.license_profile.name
+    except ObjectDoesNotExist:
+        return f'{license_obj.legal_business_name} {license_obj.client_id}'
+
+
+def refresh_license_buyer_summary(license_obj, books_name):
+    """
+    Compute buyer summary from Zoho Books and store it.
+    """
+    customer_name = get_buyer_summary_customer_name(license_obj)
+    obj, _ = LicenseBuyerSummary.objects.get_or_create(
+        license=license_obj,
+        books_name=books_name,
+    )
+    started_at = timezone.now()
+    obj.customer_name = customer_name
+    try:
+        obj.summary = get_buyer_summary(books_name, customer_name)
+    except Exception as exc:
+        print({'license_id': license_obj.id, 'books_name': books_name, 'error': exc})
+        obj.error = str(exc)
+        obj.save(update_fields=['customer_name', 'error', 'updated_on'])
+        return obj
+    obj.error = None
+    obj.refreshed_at = timezone.now()
+    obj.save(update_fields=['customer_name', 'summary', 'error', 'refreshed_at', 'updated_on'])
+    # Keep invalidations that arrived while the summary was computed.
+    LicenseBuyerSummary.objects.filter(id=obj.id, dirty_at__lte=started_at).update(dirty_at=None)
+    obj.refresh_from_db(fields=['dirty_at'])
+    return obj
+
+
+def get_buyer_summary_pending_key(license_id, books_name):
+    return f'buyer_summary:pending:{license_id}:{books_name}'
+
+
+def queue_license_buyer_summary_refresh(license_id, books_name):
+    """
+    Queue buyer summary refresh unless one is already pending.
+    """
+    try:
+        queued = get_redis_connection().set(
+            get_buyer_summary_pending_key(license_id, books_name),
+            1,
+            nx=True,
+            ex=settings.BUYER_SUMMARY_PENDING_TTL,
+        )
+    except Exception as exc:
+        print({'license_id': license_id, 'books_name': books_name, 'error': exc})
+        queued = True
+    if queued:
+        refresh_license_buyer_summary_task.delay(license_id, books_name)
+    return bool(queued)
+
+
+@app.task(queue="general")
+def refresh_license_buyer_summary_task(license_id, books_name):
+    """
+    Refresh materialized buyer summary of a license.
+    """
+    try:
+        license_obj = License.objects.select_related('license_profile').get(id=license_id)
+    except License.DoesNotExist:
+        return
+    try:
+        refresh_license_buyer_summary(license_obj, books_name)
+    finally:
+        try:
+            get_redis_connection().delete(get_buyer_summary_pending_key(license_id, books_name))
+        except Exception as exc:
+            print({'license_id': license_id, 'books_name': books_name, 'error': exc})
+
+
+@periodic_task(run_every=(crontab(minute=15)), options={"queue": "general"})
+def refresh_stale_buyer_summaries_task():
+    """
+    Queue refresh of materialized buyer summaries that were invalidated or are
+    older than BUYER_SUMMARY_MAX_AGE.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.BUYER_SUMMARY_MAX_AGE)
+    qs = LicenseBuyerSummary.objects.filter(
+        Q(refreshed_at__isnull=True) | Q(refreshed_at__lt=stale_before) | Q(dirty_at__isnull=False)
+    ).values_list('license_id', 'books_name')
+    for license_id, books_name in qs:
+        queue_license_buyer_summary_refresh(license_id, books_name)
+
@@ -11,7 +11,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission as DjangoPermission
 from django.db import transaction
-from django.db.models import Q, F, Case, CharField, Value, When
+from django.db.models import Q, F, Case, CharField, Value, When, Count, Exists, OuterRef
 from django.core.exceptions import ObjectDoesNotExist
 from django.forms.models import model_to_dict
 from django_filters.rest_framework import DjangoFilterBackend
@@ -31,7 +31,7 @@ from rest_framework.permissions import (AllowAny, IsAuthenticated, )
 
 from core.permissions import IsAuthenticatedBrandPermission
 from inventory.models import (Documents, )
-from integration.books import  get_buyer_summary
+from inventory.utils import (get_latest_documents, get_documents_urls, )
 from integration.apps.aws import (create_presigned_url, )
 from core.utility import (notify_admins_on_slack,email_admins_on_profile_progress, )
 from core.mailer import (mail, mail_send,)
@@ -41,6 +41,8 @@ from user.serializers import (get_encrypted_data,)
 from user.views import (notify_admins,)
 from permission.filterqueryset import (filterQuerySet, )
 from .tasks import (
+    refresh_license_buyer_summary,
+    queue_license_buyer_summary_refresh,
     invite_license_user_task,
     send_license_onboarding_verification_task,
     resend_license_onboarding_verification_task,
@@ -67,6 +69,7 @@ from .models import (
     # Permission,
     LicenseUserInvite,
     OnboardingDataFetch,
+    LicenseBuyerSummary,
 )
 from .serializers import (
     OrganizationSerializer,
@@ -432,12 +435,23 @@ class LicenseViewSet(PermissionQuerysetFilterMixin,
         """
         license_obj = self.get_object()
         books_name = request.query_params.get('books_name')
+        if not books_name:
+            return Response({'books_name': 'This query parameter is required.'}, status=400)
+        refresh = request.query_params.get('refresh', '').lower() in ('1', 'true')
         try:
-            customer_name = license_obj.license_profile.name
-        except ObjectDoesNotExist:
-            customer_name = f'{license_obj.legal_business_name} {license_obj.client_id}'
-        summery = get_buyer_summary(books_name, customer_name)
-        return Response({'buyer_summary': summery}, status=200)
+            obj = LicenseBuyerSummary.objects.get(license=license_obj, books_name=books_name)
+        except LicenseBuyerSummary.DoesNotExist:
+            obj = None
+        if refresh or not obj:
+            obj = refresh_license_buyer_summary(license_obj, books_name)
+        elif obj.is_stale:
+            queue_license_buyer_summary_refresh(license_obj.id, books_name)
+        return Response({
+            'buyer_summary': obj.summary,
+            'refreshed_at': obj.refreshed_at,
+            'is_stale': obj.is_stale,
+            'error': obj.error,
+        }, status=200)
 
     @action(detail=True, url_path='update-signed-program', methods=['post'])
     def update_signed_program(self, request, pk, *args, **kwargs):
@@ -529,103 +543,123 @@ class KpiViewSet(NestedViewSetMixin, APIView):
         """
         Return QuerySet.
         """
-        # qs = License.objects.prefetch_related('cart_notification_users').all()
-        qs = License.objects.prefetch_related().all()
+        qs = License.objects.all()
         qs = self.filter_queryset_by_parents_lookups(qs)
         qs = filterQuerySet.for_user(qs, request.user)
-        value_list = qs.values_list('profile_category', flat=True).distinct()
+        qs = qs.select_related('brand', 'license_profile', 'program_overview').annotate(
+            cart_notification=Exists(License.cart_notification_users.through.objects.filter(
+                license_id=OuterRef('pk'),
+                user_id=request.user.pk,
+            )),
+        )
+        licenses = list(qs)
+
+        brand_ids = {license.brand_id for license in licenses}
+        brand_license_counts = dict()
+        if brand_ids:
+            brand_q = Q(brand_id__in=[i for i in brand_ids if i is not None])
+            if None in brand_ids:
+                brand_q |= Q(brand__isnull=True)
+            for brand_id, owner_or_manager, count in License.objects.filter(brand_q).values_list(
+                    'brand_id', 'owner_or_manager').annotate(count=Count('id')).order_by():
+                brand_license_counts[(brand_id, owner_or_manager)] = count
+
+        documents = get_latest_documents(
+            [license.id for license in licenses] + [i for i in brand_ids if i is not None],
+            ('profile_image', 'license', 'seller_permit'),
+        )
+        document_urls = get_documents_urls(documents.values())
+
+        def get_document_url(object_id, doc_type):
+            document = documents.get((str(object_id), doc_type))
+            if document:
+                return document_urls.get(document.pk)
+
         group_by_value = {}
-        for value in value_list:
-            license_obj = qs.filter(profile_category=value).select_related()
-            #license_profile_kpis = license_obj.values()
-            license_profile_kpis = []
-            for license in license_obj:
-                if hasattr(license, 'brand'):
-                    brand_data = BrandSerializer(license.brand).data
-                else:
-                    brand_data = {}
-                license_data = LicenseSerializer(license).data
-                license_profile_kpis.append({
-                    'id': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.id,
-                    'client_id': license.client_id,
-                    'name': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.name,
-                    'county': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.county,
-                    'appellation': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.appellation,
-                    'ethics_and_certification': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.ethics_and_certification,
-                    'region': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.region,
-                    'product_of_interest': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.product_of_interest,
-                    'cultivars_of_interest': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.cultivars_of_interest,
-                    'about': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.about,
-                    'other_distributors': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.other_distributors,
-                    'transportation': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.transportation,
-                    'issues_with_failed_labtest': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.issues_with_failed_labtest,
-                    'preferred_payment': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.preferred_payment,
-                    'approved_on': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.approved_on,
-                    'approved_by': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.approved_by,
-                    'agreement_signed': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.agreement_signed,
-                    'signed_program_name': "" if not hasattr(license, 'license_profile') else license.license_profile.signed_program_name,
-                    'agreement_link': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.agreement_link,
-                    'farm_profile_photo': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.farm_profile_photo,
-                    'farm_photo_sharable_link': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.farm_photo_sharable_link,
-                    'is_account_updated_in_crm': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.is_account_updated_in_crm,
-                    'is_vendor_updated_in_crm': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.is_vendor_updated_in_crm,
-                    'zoho_crm_account_id': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.zoho_crm_account_id,
-                    'zoho_crm_vendor_id': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.zoho_crm_vendor_id,
-                    'is_draft': "N/A" if not hasattr(license, 'license_profile') else license.license_profile.is_draft,
-                    'program_name': '' if not hasattr(license, 'program_overview') else license.program_overview.program_details.get('program_name', ''),
-                    'cart_notification': license.cart_notification_users.filter(pk=request.user.pk).exists(),
-                    'brand': "N/A" if not hasattr(license, 'brand') else {
-                        'id': "N/A" if not hasattr(license.brand, 'id')else license.brand.id,
-                        'brand_name': "N/A" if not hasattr(license.brand, 'brand_name') else license.brand.brand_name,
-                        'brand_category': "N/A" if not hasattr(license.brand, 'brand_category') else license.brand.brand_category,
-                        'brand_county': "N/A" if not hasattr(license.brand, 'brand_county') else license.brand.brand_county,
-                        'profile_category': "N/A" if not hasattr(license.brand, 'profile_category') else license.brand.profile_category,
-                        'licenses_owned': License.objects.filter(brand=license.brand, owner_or_manager='owner').count(),
-                        'licenses_managed': License.objects.filter(brand=license.brand, owner_or_manager='manager').count(),
-                        'updated_on': "N/A" if not hasattr(license.brand, 'updated_on') else license.brand.updated_on,
-                        'is_buyer': "N/A" if not hasattr(license.brand, 'is_buyer') else license.brand.is_buyer,
-                        'is_seller': "N/A" if not hasattr(license.brand, 'is_seller') else license.brand.is_seller,
-                        'document_url': brand_data.get('document_url'),
-                        'brand_image': brand_data.get('brand_image'),
-                        
-                    },
-                    'license': {
-                        'id': license.id,
-                        'status': "N/A" if not hasattr(license, 'status') else license.status,
-                        'step': "N/A" if not hasattr(license, 'status') else license.step,
-                        'license_status': "N/A" if not hasattr(license, 'license_status') else license.license_status,
-                        # 'is_buyer': "N/A" if not hasattr(license, 'is_buyer') else license.is_buyer,
-                        # 'is_seller': "N/A" if not hasattr(license, 'is_seller') else license.is_seller,
-                        'is_buyer': True,
-                        'is_seller': True,
-                        'updated_on': "N/A" if not hasattr(license, 'updated_on') else license.updated_on,
-                        'created_on': "N/A" if not hasattr(license, 'created_on') else license.created_on,
-                        'license_type': "N/A" if not hasattr(license, 'license_type') else license.license_type,
-                        'owner_or_manager': "N/A" if not hasattr(license, 'owner_or_manager') else license.owner_or_manager,
-                        'legal_business_name': "N/A" if not hasattr(license, 'legal_business_name') else license.legal_business_name,
-                        'license_number': "N/A" if not hasattr(license, 'license_number') else license.license_number,
-                        'expiration_date': "N/A" if not hasattr(license, 'expiration_date') else license.expiration_date,
-                        'issue_date': "N/A" if not hasattr(license, 'issue_date') else license.issue_date,
-                        'premises_address': "N/A" if not hasattr(license, 'premises_address') else license.premises_address,
-                        'premises_city': "N/A" if not hasattr(license, 'premises_city') else license.premises_city,
-                        'premises_county': "N/A" if not hasattr(license, 'premises_county') else license.premises_county,
-                        'zip_code': "N/A" if not hasattr(license, 'zip_code') else license.zip_code,
-                        'premises_apn': "N/A" if not hasattr(license, 'premises_apn') else license.premises_apn,
-                        'premises_state': "N/A" if not hasattr(license, 'premises_state') else license.premises_state,
-                        'uploaded_license_to': "N/A" if not hasattr(license, 'uploaded_license_to') else license.uploaded_license_to,
-                        'uploaded_sellers_permit_to': "N/A" if not hasattr(license, 'uploaded_sellers_permit_to') else license.uploaded_sellers_permit_to,
-                        'uploaded_w9_to': "N/A" if not hasattr(license, 'uploaded_w9_to') else license.uploaded_w9_to,
-                        'associated_program': "N/A" if not hasattr(license, 'associated_program') else license.associated_program,
-                        'profile_category': "N/A" if not hasattr(license, 'profile_category') else license.profile_category,
-                        'business_structure': "N/A" if not hasattr(license, 'business_structure') else license.business_structure,
-                        'tax_identification': "N/A" if not hasattr(license, 'tax_identification') else license.tax_identification,
-                        'ein_or_ssn': "N/A" if not hasattr(license, 'ein_or_ssn') else license.ein_or_ssn,
-                        'license_url': license_data.get('license_url'),
-                        'seller_permit_url': license_data.get('seller_permit_url'),
-                        'license_profile_url': license_data.get('license_profile_url'),
-                    }
-                })
-            group_by_value[value] = license_profile_kpis
+        for license in licenses:
+            lp = getattr(license, 'license_profile', None)
+            lp_value = lambda field, default="N/A": default if lp is None else getattr(lp, field)
+            brand = license.brand
+            program_overview = getattr(license, 'program_overview', None)
+            group_by_value.setdefault(license.profile_category, []).append({
+                'id': lp_value('id'),
+                'client_id': license.client_id,
+                'name': lp_value('name'),
+                'county': lp_value('county'),
+                'appellation': lp_value('appellation'),
+                'ethics_and_certification': lp_value('ethics_and_certification'),
+                'region': lp_value('region'),
+                'product_of_interest': lp_value('product_of_interest'),
+                'cultivars_of_interest': lp_value('cultivars_of_interest'),
+                'about': lp_value('about'),
+                'other_distributors': lp_value('other_distributors'),
+                'transportation': lp_value('transportation'),
+                'issues_with_failed_labtest': lp_value('issues_with_failed_labtest'),
+                'preferred_payment': lp_value('preferred_payment'),
+                'approved_on': lp_value('approved_on'),
+                'approved_by': lp_value('approved_by'),
+                'agreement_signed': lp_value('agreement_signed'),
+                'signed_program_name': lp_value('signed_program_name', ""),
+                'agreement_link': lp_value('agreement_link'),
+                'farm_profile_photo': lp_value('farm_profile_photo'),
+                'farm_photo_sharable_link': lp_value('farm_photo_sharable_link'),
+                'is_account_updated_in_crm': lp_value('is_account_updated_in_crm'),
+                'is_vendor_updated_in_crm': lp_value('is_vendor_updated_in_crm'),
+                'zoho_crm_account_id': lp_value('zoho_crm_account_id'),
+                'zoho_crm_vendor_id': lp_value('zoho_crm_vendor_id'),
+                'is_draft': lp_value('is_draft'),
+                'program_name': '' if program_overview is None else program_overview.program_details.get('program_name', ''),
+                'cart_notification': license.cart_notification,
+                'brand': {
+                    'id': "N/A" if brand is None else brand.id,
+                    'brand_name': "N/A" if brand is None else brand.brand_name,
+                    'brand_category': "N/A" if brand is None else brand.brand_category,
+                    'brand_county': "N/A" if brand is None else brand.brand_county,
+                    'profile_category': "N/A" if brand is None else brand.profile_category,
+                    'licenses_owned': brand_license_counts.get((license.brand_id, 'owner'), 0),
+                    'licenses_managed': brand_license_counts.get((license.brand_id, 'manager'), 0),
+                    'updated_on': "N/A" if brand is None else brand.updated_on,
+                    'is_buyer': "N/A" if brand is None else brand.is_buyer,
+                    'is_seller': "N/A" if brand is None else brand.is_seller,
+                    'document_url': None if brand is None else get_document_url(brand.id, 'profile_image'),
+                    'brand_image': None if brand is None else get_document_url(brand.id, 'profile_image'),
+                },
+                'license': {
+                    'id': license.id,
+                    'status': license.status,
+                    'step': license.step,
+                    'license_status': license.license_status,
+                    # 'is_buyer': "N/A" if not hasattr(license, 'is_buyer') else license.is_buyer,
+                    # 'is_seller': "N/A" if not hasattr(license, 'is_seller') else license.is_seller,
+                    'is_buyer': True,
+                    'is_seller': True,
+                    'updated_on': license.updated_on,
+                    'created_on': license.created_on,
+                    'license_type': license.license_type,
+                    'owner_or_manager': license.owner_or_manager,
+                    'legal_business_name': license.legal_business_name,
+                    'license_number': license.license_number,
+                    'expiration_date': license.expiration_date,
+                    'issue_date': license.issue_date,
+                    'premises_address': license.premises_address,
+                    'premises_city': license.premises_city,
+                    'premises_county': license.premises_county,
+                    'zip_code': license.zip_code,
+                    'premises_apn': license.premises_apn,
+                    'premises_state': license.premises_state,
+                    'uploaded_license_to': license.uploaded_license_to,
+                    'uploaded_sellers_permit_to': license.uploaded_sellers_permit_to,
+                    'uploaded_w9_to': license.uploaded_w9_to,
+                    'associated_program': license.associated_program,
+                    'profile_category': license.profile_category,
+                    'business_structure': license.business_structure,
+                    'tax_identification': license.tax_identification,
+                    'ein_or_ssn': license.ein_or_ssn,
+                    'license_url': get_document_url(license.id, 'license'),
+                    'seller_permit_url': get_document_url(license.id, 'seller_permit'),
+                    'license_profile_url': get_document_url(license.id, 'profile_image'),
+                }
+            })
 
         return Response({"kpis": group_by_value})
 
@@ -11,13 +11,11 @@ from django.conf import settings
 from rest_framework import serializers
 from phonenumber_field.serializerfields import PhoneNumberField
 
-from core.settings import (AWS_BUCKET, )
 from user.models import User
 from inventory.models import (Documents, )
 from core.utility import (email_admins_on_profile_registration_completed,notify_admins_on_slack_complete,)
-from inventory.models import (Documents, )
 from integration.box import upload_file
-from integration.apps.aws import (create_presigned_url, )
+from core.mixins.serializers import (DocumentURLListSerializer, DocumentURLSerializerMixin, )
 from user.models import (User,)
 from utils import (reverse_admin_change_path,)
 from .models import (
@@ -25,7 +23,7 @@ from .models import (
 )
 
 
-class ListGroupBySerializer(serializers.ListSerializer):
+class ListGroupBySerializer(DocumentURLListSerializer):
     group_by_field = 'profile_category'
 
     def to_representation(self, data):
@@ -51,69 +49,36 @@ class ListGroupBySerializer(serializers.ListSerializer):
         return super(serializers.ListSerializer, self).data
 
 
-class BinderLicenseSerializer(serializers.ModelSerializer):
+class BinderLicenseSerializer(DocumentURLSerializerMixin, serializers.ModelSerializer):
     """
     This defines license serializer.
     """
+    document_types = ('profile_image', 'license', 'seller_permit')
     status=serializers.ReadOnlyField()
     license_url = serializers.SerializerMethodField()
     seller_permit_url = serializers.SerializerMethodField()
     license_profile_url = serializers.SerializerMethodField()
 
+    def get_document_object_id(self, obj):
+        return obj.profile_license_id
+
     def get_license_profile_url(self, obj):
         """
         Return s3 license url.
         """
-        if obj.profile_license:
-            try:
-                document = Documents.objects.filter(object_id=obj.profile_license.id, doc_type='profile_image').latest('created_on')
-                if document.box_url:
-                    return document.box_url
-                else:
-                    path = document.path
-                    url = create_presigned_url(AWS_BUCKET, path)
-                    if url.get('response'):
-                        return url.get('response')
-            except Exception:
-                pass
-        return None
-    
+        return self.get_cached_document_url(obj, 'profile_image')
+
     def get_license_url(self, obj):
         """
         Return s3 license url.
         """
-        if obj.profile_license:
-            try:
-                license = Documents.objects.filter(object_id=obj.profile_license.id, doc_type='license').latest('created_on')
-                if license.box_url:
-                    return license.box_url
-                else:
-                    path = license.path
-                    url = create_presigned_url(AWS_BUCKET, path)
-                    if url.get('response'):
-                        return url.get('response')
-            except Exception:
-                pass
-        return None
+        return self.get_cached_document_url(obj, 'license')
 
     def get_seller_permit_url(self, obj):
         """
         Return s3 license url.
         """
-        if obj.profile_license:
-            try:
-                seller = Documents.objects.filter(object_id=obj.profile_license.id, doc_type='seller_permit').latest('created_on')
-                if seller.box_url:
-                    return seller.box_url
-                else:
-                    path = seller.path
-                    url = create_presigned_url(AWS_BUCKET, path)
-                    if url.get('response'):
-                        return url.get('response')
-            except Exception:
-                pass
-        return None
-
+        return self.get_cached_document_url(obj, 'seller_permit')
 
     class Meta:
         model = BinderLicense
@@ -0,0 +1,68 @@
+"""
+Shared cache helpers.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from core.settings import (REDIS_URL, )
+
+_redis_pool = None
+_redis_pool_lock = threading.Lock()
+
+
+def get_redis_connection():
+    """
+    Return redis client backed by a process wide connection pool.
+    """
+    global _redis_pool
+    if _redis_pool is None:
+        with _redis_pool_lock:
+            if _redis_pool is None:
+                _redis_pool = redis.ConnectionPool.from_url(REDIS_URL)
+    return redis.Redis(connection_pool=_redis_pool)
+
+
+class TTLCache:
+    """
+    Thread safe in-process cache with per entry expiry.
+    Least recently used entries are evicted beyond maxsize.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -84,3 +84,48 @@ def batch_create_update(model, keys, lookup_keys, items, bulk_remove_filter=None
             model.objects.filter(**_item_filter).delete()
 
     model.objects.bulk_create(all_bulk_creation, batch_size=batch_size)
+
+
+def bulk_upsert(model, objs, update_fields, conflict_fields=None):
+    """
+    Insert a list of model instances in a single statement, updating
+    `update_fields` of rows that already exist (Postgres ON CONFLICT).
+    Signals are not sent and pre_save() is only applied on insert values.
+    Returns number of rows written.
+    """
+    from django.db import connections, router
+
+    if not objs:
+        return 0
+    meta = model._meta
+    conflict_fields = conflict_fields or [meta.pk.name]
+    connection = connections[router.db_for_write(model)]
+    fields = [f for f in meta.concrete_fields]
+    columns = [f.column for f in fields]
+    conflict_columns = [meta.get_field(name).column for name in conflict_fields]
+    update_columns = [
+        meta.get_field(name).column for name in update_fields
+        if name not in conflict_fields]
+
+    qn = connection.ops.quote_name
+    row_placeholder = '(%s)' % ', '.join(['%s'] * len(fields))
+    params = []
+    for obj in objs:
+        for f in fields:
+            params.append(f.get_db_prep_save(f.pre_save(obj, True), connection=connection))
+
+    if update_columns:
+        on_conflict = 'DO UPDATE SET %s' % ', '.join(
+            '%s = EXCLUDED.%s' % (qn(col), qn(col)) for col in update_columns)
+    else:
+        on_conflict = 'DO NOTHING'
+    sql = 'INSERT INTO %s (%s) VALUES %s ON CONFLICT (%s) %s' % (
+        qn(meta.db_table),
+        ', '.join(qn(col) for col in columns),
+        ', '.join([row_placeholder] * len(objs)),
+        ', '.join(qn(col) for col in conflict_columns),
+        on_conflict,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
@@ -0,0 +1,62 @@
+"""
+Serializer mixins.
+"""
+from django.db import models
+from rest_framework import serializers
+
+from inventory.utils import (get_latest_documents, get_documents_urls, )
+
+
+class DocumentURLListSerializer(serializers.ListSerializer):
+    """
+    Resolve document urls of all objects on a page in one query.
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        data = list(data)
+        if hasattr(self.child, 'prefetch_document_urls'):
+            self.child.prefetch_document_urls(data)
+        return super().to_representation(data)
+
+
+class DocumentURLSerializerMixin:
+    """
+    Serve latest document url per (object id, doc type) from a per serializer
+    cache filled by DocumentURLListSerializer, single objects are resolved on
+    first access.
+    """
+    document_types = ()
+
+    def get_document_object_id(self, obj):
+        return obj.id
+
+    def prefetch_document_urls(self, objs):
+        cache = self.__dict__.setdefault('_document_url_cache', dict())
+        object_ids = set()
+        for obj in objs:
+            object_id = self.get_document_object_id(obj)
+            if object_id is not None and (str(object_id), self.document_types[0]) not in cache:
+                object_ids.add(str(object_id))
+        if not object_ids:
+            return
+        try:
+            documents = get_latest_documents(object_ids, self.document_types)
+            urls = get_documents_urls(documents.values())
+        except Exception as exc:
+            print(exc)
+            documents = urls = dict()
+        for object_id in object_ids:
+            for doc_type in self.document_types:
+                document = documents.get((object_id, doc_type))
+                cache[(object_id, doc_type)] = urls.get(document.pk) if document else None
+
+    def get_cached_document_url(self, obj, doc_type):
+        object_id = self.get_document_object_id(obj)
+        if object_id is None:
+            return None
+        key = (str(object_id), doc_type)
+        if key not in self.__dict__.get('_document_url_cache', {}):
+            self.prefetch_document_urls([obj])
+        return self._document_url_cache.get(key)
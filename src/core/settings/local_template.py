@@ -71,6 +71,7 @@ cwd = os.getcwd()
 ZOHO_CLIENT_ID = ''
 ZOHO_CLIENT_SECRET = ''
 ZOHO_REDIRECT_URI = ''
+ZOHO_TOKEN_REFRESH_MARGIN = 300
 
 
 #Zoho Take credential from the team.
@@ -127,6 +128,12 @@ ESTIMATE_TAXES = {'Flower': 'Cultivation Tax - Flower (2020)', 'Trim': 'Cultivat
 TRANSPORTATION_FEES = 'Transportation Fees'
 #BOOKS_ORGANIZATION_LIST = ['books_efd', 'books_efl', 'books_efn']
 BOOKS_ORGANIZATION_LIST = "books_efd,books_efl,books_efn"
+BOOKS_FANOUT_WORKERS = 6
+BOOKS_RATE_LIMIT_PER_SECOND = 2
+BOOKS_RATE_LIMIT_BURST = 3
+BOOKS_DOCUMENT_CACHE_TTL = 86400
+BUYER_SUMMARY_MAX_AGE = 21600
+BUYER_SUMMARY_PENDING_TTL = 900
 
 #Zoho Sign configuration
 SIGN_CLIENT_ID=''
@@ -214,6 +221,10 @@ AWS_CLIENT_ID=''
 AWS_CLIENT_SECRET = ''
 AWS_BUCKET = ''
 AWS_REGION = ''
+AWS_MAX_POOL_CONNECTIONS = 20
+AWS_UPLOAD_WORKERS = 8
+AWS_PRESIGNED_URL_CACHE_SIZE = 4096
+AWS_PRESIGNED_URL_CACHE_MARGIN = 3600
 
 # Authy Application Key
 # You can get/create one here: https://www.twilio.com/console/authy/applications
@@ -234,6 +245,18 @@ AWS_SECRET_ACCESS_KEY = ''
 AWS_STORAGE_BUCKET_NAME = 'help-documentation'
 
 NUMBER_OF_DAYS_TO_FETCH_INVENTORY=150
+INVENTORY_BULK_SYNC = False
+INVENTORY_SYNC_PAGE_SIZE = 200
+INVENTORY_VENDOR_CACHE_TTL = 3600
+INVENTORY_VENDOR_MISS_CACHE_TTL = 300
+INVENTORY_VENDOR_CACHE_SIZE = 2048
+INVENTORY_CATEGORY_COUNT_CACHE_TTL = 60
+INVENTORY_METADATA_CACHE_TTL = 86400
+INVENTORY_METADATA_MEMORY_CACHE_TTL = 60
+INVENTORY_FACET_CACHE_TTL = 86400
+INVENTORY_LIST_CACHE_TTL = 900
+FEE_VARIABLE_CACHE_TTL = 300
+PERMISSION_SNAPSHOT_CACHE_TTL = 3600
 
 ONBOARDING_DATA_FETCH_EMAIL_OVERRIDE = []
 
@@ -242,6 +265,8 @@ BACKEND_DOMAIN_NAME = 'eco-farm-staging.herokuapp.com'
 CUSTOM_INVENTORY_WAREHOUSE_NAME = 'Test Books Organization'
 
 INVENTORY_CSV_UPLOAD_FOLDER_ID = '133586884521'
+INVENTORY_EXPORT_CHUNK_SIZE = 2000
+INVENTORY_EXPORT_SPOOL_SIZE = 10485760
 
 INVENTORY_QR_UPLOAD_FOLDER_ID = '149397343347'
 
@@ -292,6 +317,7 @@ PASSWORDLESS_AUTH = {
 
 AWS_OUTPUT_BUCKET='compressed-ecofarm-staging'
 INVENTORY_IMAGE_CROP_RATIO=1.6
+INVENTORY_DOCUMENT_WORKERS = 4
 
 #Confia
 CONFIA_ACCESS_KEY = ''
@@ -64,6 +64,7 @@ INTEGRATION_ADMIN_TOKEN_MASK = os.environ.get('INTEGRATION_ADMIN_TOKEN_MASK', 't
 ZOHO_CLIENT_ID = os.environ.get('ZOHO_CLIENT_ID')
 ZOHO_CLIENT_SECRET = os.environ.get('ZOHO_CLIENT_SECRET')
 ZOHO_REDIRECT_URI = os.environ.get('ZOHO_REDIRECT_URI')
+ZOHO_TOKEN_REFRESH_MARGIN = int(os.environ.get('ZOHO_TOKEN_REFRESH_MARGIN', 300))
 
 PYZOHO_CONFIG = {
     'apiBaseUrl': 'https://www.zohoapis.com',
@@ -115,6 +116,12 @@ BOOKS_ORGANIZATION_EFL_ID = os.environ.get('BOOKS_ORGANIZATION_EFL_ID'),
 BOOKS_ORGANIZATION_EFN_ID = os.environ.get('BOOKS_ORGANIZATION_EFN_ID'),
 ESTIMATE_TAXES = os.environ.get('ESTIMATE_TAXES')
 BOOKS_ORGANIZATION_LIST = os.environ.get('BOOKS_ORGANIZATION_LIST')
+BOOKS_FANOUT_WORKERS = int(os.environ.get('BOOKS_FANOUT_WORKERS', 6))
+BOOKS_RATE_LIMIT_PER_SECOND = float(os.environ.get('BOOKS_RATE_LIMIT_PER_SECOND', 2))
+BOOKS_RATE_LIMIT_BURST = int(os.environ.get('BOOKS_RATE_LIMIT_BURST', 3))
+BOOKS_DOCUMENT_CACHE_TTL = int(os.environ.get('BOOKS_DOCUMENT_CACHE_TTL', 86400))
+BUYER_SUMMARY_MAX_AGE = int(os.environ.get('BUYER_SUMMARY_MAX_AGE', 21600))
+BUYER_SUMMARY_PENDING_TTL = int(os.environ.get('BUYER_SUMMARY_PENDING_TTL', 900))
 
 # Zoho Sign configuration
 SIGN_CLIENT_ID = os.environ.get('SIGN_CLIENT_ID', ZOHO_CLIENT_ID)
@@ -194,6 +201,10 @@ AWS_CLIENT_ID = os.environ.get('AWS_CLIENT_ID')
 AWS_CLIENT_SECRET = os.environ.get('AWS_CLIENT_SECRET')
 AWS_BUCKET = os.environ.get('AWS_BUCKET')
 AWS_REGION = os.environ.get('AWS_REGION')
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', 20))
+AWS_UPLOAD_WORKERS = int(os.environ.get('AWS_UPLOAD_WORKERS', 8))
+AWS_PRESIGNED_URL_CACHE_SIZE = int(os.environ.get('AWS_PRESIGNED_URL_CACHE_SIZE', 4096))
+AWS_PRESIGNED_URL_CACHE_MARGIN = int(os.environ.get('AWS_PRESIGNED_URL_CACHE_MARGIN', 3600))
 
 # Authy Application Key
 # You can get/create one here : https://www.twilio.com/console/authy/applications
@@ -216,6 +227,18 @@ AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
 AWS_STORAGE_BUCKET_NAME = os.environ.get('AWS_STORAGE_BUCKET_NAME')
 
 NUMBER_OF_DAYS_TO_FETCH_INVENTORY = os.environ.get('NUMBER_OF_DAYS_TO_FETCH_INVENTORY')
+INVENTORY_BULK_SYNC = os.environ.get('INVENTORY_BULK_SYNC', 'false').lower() == 'true'
+INVENTORY_SYNC_PAGE_SIZE = int(os.environ.get('INVENTORY_SYNC_PAGE_SIZE', 200))
+INVENTORY_VENDOR_CACHE_TTL = int(os.environ.get('INVENTORY_VENDOR_CACHE_TTL', 3600))
+INVENTORY_VENDOR_MISS_CACHE_TTL = int(os.environ.get('INVENTORY_VENDOR_MISS_CACHE_TTL', 300))
+INVENTORY_VENDOR_CACHE_SIZE = int(os.environ.get('INVENTORY_VENDOR_CACHE_SIZE', 2048))
+INVENTORY_CATEGORY_COUNT_CACHE_TTL = int(os.environ.get('INVENTORY_CATEGORY_COUNT_CACHE_TTL', 60))
+INVENTORY_METADATA_CACHE_TTL = int(os.environ.get('INVENTORY_METADATA_CACHE_TTL', 86400))
+INVENTORY_METADATA_MEMORY_CACHE_TTL = int(os.environ.get('INVENTORY_METADATA_MEMORY_CACHE_TTL', 60))
+INVENTORY_FACET_CACHE_TTL = int(os.environ.get('INVENTORY_FACET_CACHE_TTL', 86400))
+INVENTORY_LIST_CACHE_TTL = int(os.environ.get('INVENTORY_LIST_CACHE_TTL', 900))
+FEE_VARIABLE_CACHE_TTL = int(os.environ.get('FEE_VARIABLE_CACHE_TTL', 300))
+PERMISSION_SNAPSHOT_CACHE_TTL = int(os.environ.get('PERMISSION_SNAPSHOT_CACHE_TTL', 3600))
 
 ONBOARDING_DATA_FETCH_EMAIL_OVERRIDE = json.loads(os.environ.get("ONBOARDING_DATA_FETCH_EMAIL_OVERRIDE", "[]"))
 
@@ -224,6 +247,8 @@ BACKEND_DOMAIN_NAME = os.environ.get("BACKEND_DOMAIN_NAME")
 CUSTOM_INVENTORY_WAREHOUSE_NAME = os.environ.get("CUSTOM_INVENTORY_WAREHOUSE_NAME")
 
 INVENTORY_CSV_UPLOAD_FOLDER_ID = os.environ.get('INVENTORY_CSV_UPLOAD_FOLDER_ID')
+INVENTORY_EXPORT_CHUNK_SIZE = int(os.environ.get('INVENTORY_EXPORT_CHUNK_SIZE', 2000))
+INVENTORY_EXPORT_SPOOL_SIZE = int(os.environ.get('INVENTORY_EXPORT_SPOOL_SIZE', 10485760))
 
 INVENTORY_QR_UPLOAD_FOLDER_ID = os.environ.get('INVENTORY_QR_UPLOAD_FOLDER_ID')
 
@@ -268,6 +293,7 @@ PASSWORDLESS_AUTH = {
 
 AWS_OUTPUT_BUCKET = os.environ.get('AWS_OUTPUT_BUCKET')
 INVENTORY_IMAGE_CROP_RATIO = float(os.environ.get('INVENTORY_IMAGE_CROP_RATIO'))
+INVENTORY_DOCUMENT_WORKERS = int(os.environ.get('INVENTORY_DOCUMENT_WORKERS', 4))
 
 #Confia
 CONFIA_ACCESS_KEY = os.environ.get('CONFIA_ACCESS_KEY')
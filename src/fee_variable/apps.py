@@ -5,3 +5,5 @@ class FeeVariableConfig(AppConfig):
     name = "fee_variable"
     verbose_name = "Fees & Variables"
 
+    def ready(self):
+        from . import signal_handlers
@@ -0,0 +1,15 @@
+from django.db.models import signals
+from django.apps import apps
+
+from .utils import (clear_fee_variable_cache, )
+
+
+def clear_fee_variable_cache_handler(sender, **kwargs):
+    clear_fee_variable_cache()
+
+
+for model in (
+        apps.get_model('fee_variable', 'TaxVariable'),
+        apps.get_model('fee_variable', 'CustomInventoryVariable')):
+    signals.post_save.connect(clear_fee_variable_cache_handler, sender=model, dispatch_uid=f'clear_fee_variable_cache_save_{model.__name__}')
+    signals.post_delete.connect(clear_fee_variable_cache_handler, sender=model, dispatch_uid=f'clear_fee_variable_cache_delete_{model.__name__}')
@@ -4,8 +4,11 @@ from django.contrib import messages
 from django.core.exceptions import ObjectDoesNotExist
 
 from brand.models import (License, LicenseProfile,)
+from core.cache import (TTLCache, )
+from core.settings import (FEE_VARIABLE_CACHE_TTL, )
 from .models import (
     CustomInventoryVariable,
+    TaxVariable,
     VendorInventoryCategoryAccounts,
     VendorInventoryDefaultAccounts,
     VendorInventoryCategoryAccounts,
@@ -110,6 +113,39 @@ PERCENTAGE_BASED_MSCP_FEE_ITEM_CATEGORIES = (
     'Terpenes - Cultivar Blended',
 )
 
+# Current tax and inventory variables, cleared by fee_variable signal handlers.
+FEE_VARIABLE_CACHE = TTLCache(maxsize=64, ttl=FEE_VARIABLE_CACHE_TTL)
+TAX_VARIABLE_CACHE_KEY = 'tax_variable'
+_NOT_FOUND = object()
+
+
+def get_cached_tax_variable():
+    """
+    Return current TaxVariable, raise TaxVariable.DoesNotExist if not found.
+    """
+    tax_var = FEE_VARIABLE_CACHE.get(TAX_VARIABLE_CACHE_KEY)
+    if tax_var is None:
+        tax_var = TaxVariable.objects.latest('-created_on')
+        FEE_VARIABLE_CACHE.set(TAX_VARIABLE_CACHE_KEY, tax_var)
+    return tax_var
+
+
+def get_cached_inventory_variable(program_type=None, tier=None):
+    """
+    Return current CustomInventoryVariable for program type and tier.
+    """
+    filters = {k: v for k, v in (('program_type', program_type), ('tier', tier)) if v is not None}
+    key = ('inventory_variable',) + tuple(sorted(filters.items()))
+    inventory_variable = FEE_VARIABLE_CACHE.get(key, _NOT_FOUND)
+    if inventory_variable is _NOT_FOUND:
+        inventory_variable = CustomInventoryVariable.objects.filter(**filters).order_by('-created_on').first()
+        FEE_VARIABLE_CACHE.set(key, inventory_variable)
+    return inventory_variable
+
+
+def clear_fee_variable_cache():
+    FEE_VARIABLE_CACHE.clear()
+
 
 def get_item_mcsp_fee(vendor_name, license_profile=None, item_category=None, farm_price=None, request=None, no_tier_fee=True ):
     msg_error = lambda msg: messages.error(request, msg,) if request else print(msg)
@@ -133,7 +169,7 @@ def get_item_mcsp_fee(vendor_name, license_profile=None, item_category=None, far
                             messages.warning(request, f'No signed program tier found for profile, using {program_name} MCSP fee.',)
 
                     tier = custom_inventory_variable_program_map.get(program_name, {})
-                    inventory_variable = CustomInventoryVariable.objects.filter(**tier).order_by('-created_on').first()
+                    inventory_variable = get_cached_inventory_variable(**tier)
                     if inventory_variable and hasattr(inventory_variable, fee_var) and getattr(inventory_variable, fee_var) is not None:
                         try:
                             db_val = Decimal(getattr(inventory_variable, fee_var))
@@ -178,6 +214,37 @@ def get_item_mcsp_fee(vendor_name, license_profile=None, item_category=None, far
         else:
             msg_error('Item category not supported or not defined.')
 
+def get_items_mcsp_fee(items, request=None, no_tier_fee=True):
+    """
+    Return list of MCSP fees for a page of items.
+
+    Each item is a dict with 'vendor_name', 'item_category', 'farm_price' and
+    optional 'license_profile'. License profiles are fetched in one query.
+    """
+    items = list(items)
+    vendor_names = {
+        item.get('vendor_name') for item in items
+        if item.get('vendor_name') and not item.get('license_profile')
+    }
+    license_profiles = dict()
+    if vendor_names:
+        qs = LicenseProfile.objects.filter(name__in=vendor_names).select_related('license').order_by('pk')
+        for lp in qs:
+            license_profiles.setdefault(lp.name, lp)
+    fees = list()
+    for item in items:
+        vendor_name = item.get('vendor_name')
+        fees.append(get_item_mcsp_fee(
+            vendor_name,
+            license_profile=item.get('license_profile') or license_profiles.get(vendor_name),
+            item_category=item.get('item_category'),
+            farm_price=item.get('farm_price'),
+            request=request,
+            no_tier_fee=no_tier_fee,
+        ))
+    return fees
+
+
 def get_new_items_accounts(zoho_organization: str, item_category: str):
     """
         get ids of sales account, purchase account and inventory account from database for new item.
@@ -1,10 +1,21 @@
 """
 Aws module.
 """
+import os
+import threading
+from concurrent.futures import (ThreadPoolExecutor, )
 import boto3
 from botocore.client import (Config, UNSIGNED)
 from botocore.exceptions import ClientError
-from core.settings import (AWS_CLIENT_ID, AWS_CLIENT_SECRET, AWS_REGION, AWS_OUTPUT_BUCKET)
+from core.cache import (TTLCache, )
+from core.settings import (AWS_CLIENT_ID, AWS_CLIENT_SECRET, AWS_REGION, AWS_OUTPUT_BUCKET,
+                           AWS_MAX_POOL_CONNECTIONS, AWS_UPLOAD_WORKERS,
+                           AWS_PRESIGNED_URL_CACHE_SIZE, AWS_PRESIGNED_URL_CACHE_MARGIN)
+
+_clients = dict()
+_clients_lock = threading.Lock()
+# Signed urls are reused until AWS_PRESIGNED_URL_CACHE_MARGIN seconds before expiry.
+PRESIGNED_URL_CACHE = TTLCache(maxsize=AWS_PRESIGNED_URL_CACHE_SIZE)
 
 
 def get_boto_resource_s3(
@@ -48,11 +59,34 @@ def get_boto_client(
         **kwargs,
     )
 
+def get_cached_boto_client(resource, unsigned=False):
+    """
+    Return aws client for resource shared within the process.
+    boto3 clients are thread safe, connections are pooled up to
+    AWS_MAX_POOL_CONNECTIONS per client.
+
+    @param resource: aws resource name.
+    @param unsigned: return client for unsigned requests.
+    """
+    key = (os.getpid(), resource, unsigned)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                config = Config(max_pool_connections=AWS_MAX_POOL_CONNECTIONS)
+                if unsigned:
+                    client = boto3.client(resource, config=config.merge(Config(signature_version=UNSIGNED)))
+                else:
+                    client = get_boto_client(resource, config=config)
+                _clients[key] = client
+    return client
+
 def create_presigned_post(bucket_name, object_name, expiration=3600):
     """
     Generate a presigned URL S3 POST request to upload a file
     """
-    s3_client = get_boto_client('s3')
+    s3_client = get_cached_boto_client('s3')
     try:
         response = s3_client.generate_presigned_url('put_object',
                                              Params={
@@ -74,7 +108,7 @@ def create_presigned_url(bucket_name, object_name, expiration=604800):
     @param expiration: Time in seconds for the presigned URL to remain valid
     @return: Presigned URL as string. If error, returns None.
     """
-    s3_client = get_boto_client('s3')
+    s3_client = get_cached_boto_client('s3')
     try:
         response = s3_client.generate_presigned_url(
             'get_object',
@@ -87,17 +121,51 @@ def create_presigned_url(bucket_name, object_name, expiration=604800):
     return {'status_code': 0, 'response': response}
 
 
+def create_presigned_urls(bucket_name, object_names, expiration=604800):
+    """
+    Return dict of presigned URLs by object name, None for failed ones.
+    URLs are signed locally with the shared client, no request is made to S3.
+    """
+    s3_client = get_cached_boto_client('s3')
+    cache_ttl = expiration - AWS_PRESIGNED_URL_CACHE_MARGIN
+    urls = dict()
+    for object_name in set(object_names):
+        key = (bucket_name, object_name, expiration)
+        url = PRESIGNED_URL_CACHE.get(key)
+        if url is None:
+            try:
+                url = s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={'Bucket': bucket_name,
+                            'Key': object_name},
+                    ExpiresIn=expiration)
+            except ClientError as exc:
+                print(exc)
+            else:
+                if cache_ttl > 0:
+                    PRESIGNED_URL_CACHE.set(key, url, ttl=cache_ttl)
+        urls[object_name] = url
+    return urls
 
 
 def get_s3_output_url_unsigned(key, Bucket):
-    s3_unsigned_config = Config(signature_version=UNSIGNED)
-    S3_unsigned = boto3.client('s3', config=s3_unsigned_config)
+    S3_unsigned = get_cached_boto_client('s3', unsigned=True)
     return S3_unsigned.generate_presigned_url('get_object', ExpiresIn=0, Params={'Bucket': Bucket, 'Key': key})
 
 
-def upload_compressed_file_stream_to_s3(file_obj, key, content_type=None):
-    S3 = get_boto_resource_s3()
-    S3_bucket = S3.Bucket(AWS_OUTPUT_BUCKET)
+def get_s3_object_metadata(key, bucket=AWS_OUTPUT_BUCKET):
+    """
+    Return user metadata of s3 object, None if object does not exist.
+    """
+    try:
+        response = get_cached_boto_client('s3').head_object(Bucket=bucket, Key=key)
+    except ClientError:
+        return None
+    return response.get('Metadata', {})
+
+
+def upload_compressed_file_stream_to_s3(file_obj, key, content_type=None, metadata=None):
+    S3 = get_cached_boto_client('s3')
     file_obj.seek(0)
     params = {
         'CacheControl': 'max-age=604800',
@@ -105,6 +173,25 @@ def upload_compressed_file_stream_to_s3(file_obj, key, content_type=None):
     }
     if content_type:
         params.update({'ContentType': content_type})
-    S3_bucket.put_object(Key=key, Body=file_obj, **params)
+    if metadata:
+        params.update({'Metadata': metadata})
+    S3.put_object(Bucket=AWS_OUTPUT_BUCKET, Key=key, Body=file_obj, **params)
     s3_url = get_s3_output_url_unsigned(key, AWS_OUTPUT_BUCKET)
     return  s3_url
+
+
+def upload_compressed_file_streams_to_s3(items, content_type=None, metadata=None, max_workers=AWS_UPLOAD_WORKERS):
+    """
+    Upload many file streams concurrently.
+
+    @param items: iterable of (key, file_obj) pairs.
+    @return: list of s3 urls in the same order as items.
+    """
+    items = list(items)
+    if not items:
+        return list()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [
+            executor.submit(upload_compressed_file_stream_to_s3, file_obj, key, content_type, metadata)
+            for key, file_obj in items]
+        return [future.result() for future in futures]
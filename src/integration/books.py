@@ -1,7 +1,6 @@
 import sys
 import json
 import base64
-import redis
 import traceback
 from io import (BytesIO, )
 from django.core.exceptions import (ObjectDoesNotExist,)
@@ -16,12 +15,15 @@ from core.settings import (
     BOOKS_REDIRECT_URI,
     BOOKS_REFRESH_TOKEN,
     TRANSPORTATION_FEES,
-    REDIS_URL,
-    BOOKS_ORGANIZATION_LIST
+    BOOKS_ORGANIZATION_LIST,
+    BOOKS_DOCUMENT_CACHE_TTL,
 )
+from core.cache import (get_redis_connection, )
 from brand.models import (Brand, License, LicenseProfile, )
 from pyzoho.books import (Books, )
 from .models import (Integration, )
+from .client_pool import (ClientPool, )
+from .fanout import (fan_out_orgs, )
 from .crm.crm_format import (CRM_FORMAT, )
 from .books_format import (BOOKS_FORMAT_DICT, )
 from .inventory import (get_inventory_items, update_inventory_item, get_inventory_name)
@@ -32,9 +34,10 @@ from fee_variable.models import (TaxVariable, )
 if not isinstance(BOOKS_ORGANIZATION_LIST, tuple):
     BOOKS_ORGANIZATION_LIST = BOOKS_ORGANIZATION_LIST.split(',')
 
-def get_books_obj(books_name):
+def _build_books_obj(books_name):
     """
-    Get Pyzoho books object.
+    Build Pyzoho books object, storing refreshed tokens in db.
+    Return (books_obj, access_expiry).
     """
     try:
         token = Integration.objects.get(name=books_name)
@@ -61,6 +64,7 @@ def get_books_obj(books_name):
         access_expiry=access_expiry,
         access_token=access_token)
     if books_obj.refreshed:
+        access_expiry = books_obj.access_expiry[0]
         Integration.objects.update_or_create(
             name=books_name,
             defaults={
@@ -71,7 +75,16 @@ def get_books_obj(books_name):
                 "access_token":books_obj.access_token,
                 "access_expiry":books_obj.access_expiry[0]}
     )
-    return books_obj
+    return books_obj, access_expiry
+
+BOOKS_CLIENT_POOL = ClientPool(_build_books_obj)
+
+def get_books_obj(books_name):
+    """
+    Get Pyzoho books object.
+    Client is shared per organization within the process.
+    """
+    return BOOKS_CLIENT_POOL.get(books_name)
 
 def get_format_dict(module):
     """
@@ -620,10 +633,7 @@ def list_contacts(books_name, params=None):
         return contact_obj.list_contacts(parameters=params)
     
     if books_name == 'all':
-        result = dict()
-        for org in BOOKS_ORGANIZATION_LIST:
-            result[org] = _list(org)
-        return result
+        return fan_out_orgs(_list, BOOKS_ORGANIZATION_LIST)
     else:
         return _list(books_name)
 
@@ -755,17 +765,69 @@ def get_customer_payment(books_name, payment_id, params={}):
     vp_obj = obj.CustomerPayments()
     return vp_obj.get_payment(payment_id=payment_id, parameters=params)
 
+def get_books_document_cache_key(books_name, doc_type, doc_id):
+    """
+    Return redis key for Zoho Books document.
+    """
+    return f'books:{books_name}:{doc_type}:{doc_id}'
+
+def get_books_documents_from_redis(books_name, doc_type, doc_ids, fetch_func, ttl=BOOKS_DOCUMENT_CACHE_TTL):
+    """
+    Return dict of Zoho Books documents by id.
+    Cached documents are read with one MGET, only missing ones are fetched.
+    """
+    doc_ids = list(dict.fromkeys(i for i in doc_ids if i))
+    if not doc_ids:
+        return dict()
+    keys = [get_books_document_cache_key(books_name, doc_type, i) for i in doc_ids]
+    try:
+        r = get_redis_connection()
+        cached = r.mget(keys)
+    except Exception as exc:
+        print(exc)
+        r = None
+        cached = [None] * len(keys)
+    documents = dict()
+    missing = dict()
+    for doc_id, key, value in zip(doc_ids, keys, cached):
+        if value:
+            documents[doc_id] = json.loads(value)
+        else:
+            resp = fetch_func(books_name, doc_id, params={})
+            documents[doc_id] = resp
+            if isinstance(resp, dict) and not resp.get('code'):
+                missing[key] = json.dumps(resp)
+    if r is not None and missing:
+        try:
+            pipe = r.pipeline()
+            for key, value in missing.items():
+                pipe.setex(key, ttl, value)
+            pipe.execute()
+        except Exception as exc:
+            print(exc)
+    return documents
+
+def invalidate_books_documents(books_name, doc_type, doc_ids=None):
+    """
+    Delete cached Zoho Books documents, all documents of the type if no ids.
+    """
+    try:
+        r = get_redis_connection()
+        if doc_ids is None:
+            keys = list(r.scan_iter(get_books_document_cache_key(books_name, doc_type, '*')))
+        else:
+            keys = [get_books_document_cache_key(books_name, doc_type, i) for i in doc_ids]
+        if keys:
+            r.delete(*keys)
+    except Exception as exc:
+        print(exc)
+
 def get_payment_from_redis(books_name, payment_id):
     """
-    Get invoices data from redis.
+    Get payment data from redis.
     """
-    r = redis.from_url(REDIS_URL)
-    if r.get(payment_id):
-        return json.loads(r.get(payment_id))
-    else:
-        resp = get_customer_payment(books_name, payment_id, params={})
-        r.set(payment_id, json.dumps(resp))
-        return resp
+    return get_books_documents_from_redis(
+        books_name, 'customer_payment', [payment_id], get_customer_payment)[payment_id]
 
 def list_customer_payments(books_name, params=None):
     """
@@ -774,8 +836,12 @@ def list_customer_payments(books_name, params=None):
     obj = get_books_obj(books_name)
     po_obj = obj.CustomerPayments()
     payments = po_obj.list_payments(parameters=params)
+    documents = get_books_documents_from_redis(
+        books_name, 'customer_payment',
+        [payment['payment_id'] for payment in payments.get('response')],
+        get_customer_payment)
     for payment in payments.get('response'):
-        data = get_payment_from_redis(books_name, payment['payment_id'])
+        data = documents[payment['payment_id']]
         payment['balance'] = 0
         for record in data.get('invoices'):
             payment['balance'] += record['balance']
@@ -860,13 +926,8 @@ def get_invoice_from_redis(books_name, invoice_id):
     """
     Get invoices data from redis.
     """
-    r = redis.from_url(REDIS_URL)
-    if r.get(invoice_id):
-        return json.loads(r.get(invoice_id))
-    else:
-        resp = get_invoice(books_name, invoice_id, params={})
-        r.set(invoice_id, json.dumps(resp))
-        return resp
+    return get_books_documents_from_redis(
+        books_name, 'invoice', [invoice_id], get_invoice)[invoice_id]
 
 def get_buyer_summary(books_name,customer):
     """
@@ -897,26 +958,34 @@ def get_buyer_summary(books_name,customer):
         invoices = invoices.get('response', [])
         invoices_count = len(invoices)
         invoices_total = sum([i['total'] for i in invoices])
-        for invoice in invoices:
-            resp = get_invoice_from_redis(books_name, invoice.get('invoice_id'))
-            for item in resp['line_items']:
-                if 'Cultivation Tax' in item.get('name') or 'MCSP' in item.get('name'):
-                    continue
-                total_quantity += item['quantity']
-                try:
-                    inventory = Inventory.objects.filter(sku=item['sku']).latest('last_modified_time')
-                except Inventory.DoesNotExist:
-                    continue
-                try:
-                    total_items += 1
-                    if 'Flower' in inventory.category_name:
-                        category_count['flower'] += 1
-                    elif 'Trim' in inventory.category_name:
-                        category_count['trim'] += 1
-                    elif 'Smalls' in inventory.category_name:
-                        category_count['smalls'] += 1
-                except AttributeError as exc:
-                    continue
+        documents = get_books_documents_from_redis(
+            books_name, 'invoice', [i.get('invoice_id') for i in invoices], get_invoice)
+        line_items = [
+            item for invoice in invoices
+            for item in documents.get(invoice.get('invoice_id'), {})['line_items']
+            if not ('Cultivation Tax' in item.get('name') or 'MCSP' in item.get('name'))
+        ]
+        # Latest inventory item per sku in one query.
+        inventory_by_sku = {
+            i.sku: i for i in Inventory.objects.filter(
+                sku__in={item['sku'] for item in line_items}
+            ).order_by('sku', '-last_modified_time').distinct('sku')
+        }
+        for item in line_items:
+            total_quantity += item['quantity']
+            inventory = inventory_by_sku.get(item['sku'])
+            if inventory is None:
+                continue
+            try:
+                total_items += 1
+                if 'Flower' in inventory.category_name:
+                    category_count['flower'] += 1
+                elif 'Trim' in inventory.category_name:
+                    category_count['trim'] += 1
+                elif 'Smalls' in inventory.category_name:
+                    category_count['smalls'] += 1
+            except AttributeError as exc:
+                continue
         if total_items:
             for k, v in category_count.items():
                 category_percentage[k] = (v/total_items) * 100
@@ -930,10 +999,7 @@ def get_buyer_summary(books_name,customer):
             }
 
     if books_name == 'all':
-        result = dict()
-        for org in BOOKS_ORGANIZATION_LIST:
-            result[org] = _buyer_summary(org, customer)
-        return result
+        return fan_out_orgs(_buyer_summary, BOOKS_ORGANIZATION_LIST, customer)
     else:
         return _buyer_summary(books_name, customer)
 
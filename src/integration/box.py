@@ -1,5 +1,7 @@
 import os
 import json
+import time
+import threading
 from datetime import (datetime, date)
 from io import BytesIO
 from django.core.exceptions import ObjectDoesNotExist
@@ -7,6 +9,8 @@ from django.conf import settings
 
 from .models import Integration
 from boxsdk import (OAuth2, Client, JWTAuth)
+from boxsdk.network.default_network import (DefaultNetwork, )
+from boxsdk.session.session import (AuthorizedSession, )
 from boxsdk.exception import (BoxOAuthException,
                               BoxException, BoxAPIException)
 from core.celery import app
@@ -119,20 +123,90 @@ def get_box_client():
     # return Client(obj)
 
 
-def get_jwt_client():
+# Box JWT access tokens are valid for 60 minutes.
+BOX_ACCESS_TOKEN_LIFETIME = 3600
+BOX_ACCESS_TOKEN_REFRESH_MARGIN = 300
+
+BOX_CLIENT_STATS = {'auth_refreshes': 0, 'api_calls': 0}
+_box_stats_lock = threading.Lock()
+_box_client = None
+_box_client_pid = None
+_box_client_lock = threading.Lock()
+
+
+def _incr_box_stat(key):
+    with _box_stats_lock:
+        BOX_CLIENT_STATS[key] += 1
+
+
+def get_box_client_stats():
     """
-    Return box jwt object.
+    Return auth refresh and api call counts of the cached box client.
+    """
+    with _box_stats_lock:
+        return dict(BOX_CLIENT_STATS)
+
+
+class CountingNetwork(DefaultNetwork):
+    """
+    Box network layer counting api calls.
+    Shares a single requests session across calls.
+    """
+
+    def request(self, method, url, access_token, **kwargs):
+        _incr_box_stat('api_calls')
+        return super().request(method, url, access_token, **kwargs)
+
+
+class CachedJWTAuth(JWTAuth):
+    """
+    JWTAuth keeping track of when the access token was issued.
+    """
+    issued_at = None
+
+    def _auth_with_jwt(self, sub, sub_type):
+        access_token = super()._auth_with_jwt(sub, sub_type)
+        self.issued_at = time.monotonic()
+        _incr_box_stat('auth_refreshes')
+        return access_token
+
+    def is_expiring(self):
+        if self.issued_at is None:
+            return True
+        lifetime = BOX_ACCESS_TOKEN_LIFETIME - BOX_ACCESS_TOKEN_REFRESH_MARGIN
+        return time.monotonic() - self.issued_at > lifetime
+
+
+def _build_jwt_client():
+    """
+    Build box jwt client impersonating BOX_JWT_USER.
     """
     try:
         jwt_dict = json.loads(BOX_JWT_DICT)
     except Exception:
         jwt_dict = BOX_JWT_DICT
-    auth = JWTAuth.from_settings_dictionary(jwt_dict)
-    client = Client(auth)
-    service_account = client.user().get()
+    auth = CachedJWTAuth.from_settings_dictionary(jwt_dict)
+    auth.authenticate_instance()
+    client = Client(auth, session=AuthorizedSession(auth, network_layer=CountingNetwork()))
     user = client.user(user_id=BOX_JWT_USER)
     return client.as_user(user)
 
+
+def get_jwt_client():
+    """
+    Return box jwt object.
+    Client is cached per process and its token is refreshed
+    before it expires.
+    """
+    global _box_client, _box_client_pid
+    with _box_client_lock:
+        if _box_client is None or _box_client_pid != os.getpid():
+            _box_client = _build_jwt_client()
+            _box_client_pid = os.getpid()
+        elif _box_client.auth.is_expiring():
+            _box_client.auth.refresh(_box_client.auth.access_token)
+        return _box_client
+
 # -------------------------------------
 # Box functions for folder.
 # -------------------------------------
@@ -227,6 +301,27 @@ def upload_file_stream(folder_id, stream, file_name):
             return exc.context_info.get('conflicts')['id']
 
 
+# Box only accepts chunked uploads for files of 20MB or more.
+BOX_CHUNKED_UPLOAD_MIN_SIZE = 20000000
+
+
+def upload_large_file_stream(folder_id, stream, file_name, file_size):
+    """
+    Upload seekable stream of known size, in chunks if large enough.
+    """
+    if file_size < BOX_CHUNKED_UPLOAD_MIN_SIZE:
+        return upload_file_stream(folder_id, stream, file_name)
+    try:
+        client = get_box_client()
+        upload_session = client.folder(folder_id).create_upload_session(file_size, file_name)
+        uploader = upload_session.get_chunked_uploader_for_stream(stream, file_size)
+        return uploader.start()
+    except BoxException as exc:
+        if getattr(exc, 'context_info', None) and exc.context_info.get('conflicts'):
+            return exc.context_info.get('conflicts')['id']
+        raise
+
+
 def get_folder_items(folder_id):
     """
     Return sub-directories of folder.
@@ -0,0 +1,72 @@
+"""
+Process wide registry of api clients.
+"""
+import threading
+from datetime import (datetime, timedelta, )
+from django.utils import timezone
+from django.utils.dateparse import (parse_datetime, )
+from core.settings import (ZOHO_TOKEN_REFRESH_MARGIN, )
+
+# Used when a client does not report a future token expiry.
+DEFAULT_CLIENT_LIFETIME = timedelta(minutes=5)
+
+
+def to_aware_datetime(value):
+    """
+    Return timezone aware datetime for datetime/iso string value.
+    """
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if not isinstance(value, datetime):
+        return None
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.utc)
+    return value
+
+
+class ClientPool:
+    """
+    Keep one client per name for the lifetime of the process.
+
+    `factory(name)` must return a `(client, access_expiry)` tuple. Clients are
+    rebuilt only when the access token is about to expire, under a per name
+    lock so concurrent threads do not refresh the same token twice.
+    """
+
+    def __init__(self, factory, refresh_margin=ZOHO_TOKEN_REFRESH_MARGIN):
+        self.factory = factory
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self._clients = dict()
+        self._locks = dict()
+        self._lock = threading.Lock()
+
+    def _get_lock(self, name):
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _is_valid(self, entry):
+        return entry is not None and entry[1] - self.refresh_margin > timezone.now()
+
+    def get(self, name=None):
+        entry = self._clients.get(name)
+        if self._is_valid(entry):
+            return entry[0]
+        with self._get_lock(name):
+            entry = self._clients.get(name)
+            if self._is_valid(entry):
+                return entry[0]
+            client, access_expiry = self.factory(name)
+            access_expiry = to_aware_datetime(access_expiry)
+            if access_expiry is None or access_expiry - self.refresh_margin <= timezone.now():
+                # Unknown or stale expiry, the client refreshes its own token.
+                access_expiry = timezone.now() + self.refresh_margin + DEFAULT_CLIENT_LIFETIME
+            self._clients[name] = (client, access_expiry)
+            return client
+
+    def invalidate(self, name=None):
+        with self._get_lock(name):
+            self._clients.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
@@ -15,6 +15,7 @@ from core.settings import (PYZOHO_CONFIG,
     AWS_BUCKET)
 from django.conf import settings
 from django.core.exceptions import (ObjectDoesNotExist,)
+from django.db import transaction
 from user.models import (User, )
 from cultivar.models import (Cultivar, )
 from labtest.models import (LabTest, )
@@ -29,14 +30,17 @@ from integration.utils import (get_vendor_contacts, get_account_category,
 from core.mailer import mail, mail_send
 from brand.models import (Brand, License, LicenseProfile, Organization, ProgramOverview, NurseryOverview)
 from integration.models import (Integration,)
-from integration.apps.aws import (get_boto_client, )
+from integration.client_pool import (ClientPool, )
+from integration.apps.aws import (get_cached_boto_client, )
 from inventory.models import (Documents, Inventory)
+from inventory.utils import (bump_inventory_version, )
 from slacker import Slacker
 slack = Slacker(settings.SLACK_TOKEN)
 
-def get_crm_obj():
+def _build_crm_obj(name=None):
     """
-    Return ZCRM object.
+    Build ZCRM object.
+    Return (crm_obj, access_expiry) with expiry read after the build.
     """
     try:
         oauth = Integration.objects.get(name='crm')
@@ -44,11 +48,23 @@ def get_crm_obj():
         access_expiry = oauth.access_expiry
     except Integration.DoesNotExist:
         access_expiry = access_token = None
-    return CRM(PYZOHO_CONFIG,
+    crm_obj = CRM(PYZOHO_CONFIG,
         PYZOHO_REFRESH_TOKEN,
         PYZOHO_USER_IDENTIFIER,
         access_token,
         access_expiry)
+    # Tokens refreshed by the sdk are persisted through ZohoOAuthHandler.
+    access_expiry = Integration.objects.filter(name='crm').values_list('access_expiry', flat=True).first()
+    return crm_obj, access_expiry
+
+CRM_CLIENT_POOL = ClientPool(_build_crm_obj)
+
+def get_crm_obj():
+    """
+    Return ZCRM object.
+    Client is shared within the process.
+    """
+    return CRM_CLIENT_POOL.get('crm')
 
 def get_picklist(module, field_name):
     """
@@ -540,7 +556,7 @@ def upload_file_s3_to_box(aws_bucket, aws_key):
     """
     Upload file from s3 to box.
     """
-    aws_client = get_boto_client('s3')
+    aws_client = get_cached_boto_client('s3')
     print(aws_bucket, aws_key)
     file_obj = aws_client.get_object(Bucket=aws_bucket, Key=aws_key)
     md5sum = aws_client.head_object(Bucket=aws_bucket,Key=aws_key)['ETag'][1:-1]
@@ -834,7 +850,8 @@ def parse_crm_record(module, records):
 def update_or_create_cultivar(record):
     qs = Cultivar.objects.filter(cultivar_crm_id=record['cultivar_crm_id'])
     if qs.exists():
-        qs.update(**record)
+        if qs.update(**record):
+            transaction.on_commit(bump_inventory_version)
         return False
     else:
         obj = Cultivar.objects.create(**record)
@@ -938,8 +955,8 @@ def sync_labtest(record):
             defaults=record)
         if obj.Sample_I_D:
             items = Inventory.objects.filter(cf_lab_test_sample_id=obj.Sample_I_D)
-            if items.exists():
-                items.update(labtest=obj)
+            if items.exists() and items.update(labtest=obj):
+                transaction.on_commit(bump_inventory_version)
         return created
     except Exception as exc:
         print(exc)
@@ -0,0 +1,98 @@
+"""
+Concurrent per organization calls with a shared rate limit.
+"""
+import threading
+import time
+from concurrent.futures import (ThreadPoolExecutor, )
+from django.db import (connection, )
+from core.settings import (
+    BOOKS_FANOUT_WORKERS,
+    BOOKS_RATE_LIMIT_PER_SECOND,
+    BOOKS_RATE_LIMIT_BURST,
+)
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket, `acquire` blocks until a token is available.
+    """
+
+    def __init__(self, rate=BOOKS_RATE_LIMIT_PER_SECOND, capacity=BOOKS_RATE_LIMIT_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiters = dict()
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name):
+    """
+    Return process wide rate limiter for organization.
+    """
+    with _rate_limiters_lock:
+        if name not in _rate_limiters:
+            _rate_limiters[name] = TokenBucket()
+        return _rate_limiters[name]
+
+
+def _call(org, func, args, kwargs):
+    try:
+        get_rate_limiter(org).acquire()
+        return func(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def fan_out(calls, max_workers=BOOKS_FANOUT_WORKERS):
+    """
+    Run calls concurrently, rate limited per organization.
+
+    `calls` maps a key to `(org, func, args, kwargs)`. Return `(results, errors)`
+    dicts keyed like `calls`, a failing call only lands in errors.
+    """
+    results = dict()
+    errors = dict()
+    if not calls:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        futures = {
+            key: executor.submit(_call, org, func, args, kwargs)
+            for key, (org, func, args, kwargs) in calls.items()
+        }
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as exc:
+                print({'call': key, 'error': exc})
+                errors[key] = str(exc)
+    return results, errors
+
+
+def fan_out_orgs(func, orgs, *args, **kwargs):
+    """
+    Call `func(org, *args, **kwargs)` for each organization.
+    Return dict of org results, failed orgs map to {'error': ...}.
+    """
+    results, errors = fan_out({org: (org, func, (org,) + args, kwargs) for org in orgs})
+    for org, error in errors.items():
+        results[org] = {'error': error}
+    return {org: results[org] for org in orgs}
@@ -1,4 +1,7 @@
 import json
+import time
+import hashlib
+from concurrent.futures import (ThreadPoolExecutor, )
 from logging import error
 import operator
 from decimal import Decimal
@@ -18,30 +21,46 @@ from core.settings import (
     INVENTORY_BOX_ID,
     INVENTORY_TAXES,
     INVENTORY_IMAGE_CROP_RATIO,
+    INVENTORY_SYNC_PAGE_SIZE,
+    INVENTORY_VENDOR_CACHE_TTL,
+    INVENTORY_VENDOR_MISS_CACHE_TTL,
+    INVENTORY_VENDOR_CACHE_SIZE,
+    INVENTORY_DOCUMENT_WORKERS,
+    INVENTORY_CATEGORY_COUNT_CACHE_TTL,
+    INVENTORY_METADATA_CACHE_TTL,
+    INVENTORY_METADATA_MEMORY_CACHE_TTL,
+    AWS_OUTPUT_BUCKET,
 )
-from django.db.models import (Sum, F, Min, Max, Avg, Q, Func, ExpressionWrapper, DateField,)
+from django.db import transaction
+from django.db.models import (Sum, F, Min, Max, Avg, Q, Count, Func, ExpressionWrapper, DateField, CharField,)
 from django.utils import  timezone
 from pyzoho.inventory import Inventory
 from .models import (Integration, )
+from .client_pool import (ClientPool, )
 from brand.models import License
 from .inventory_data import(INVENTORY_ITEM_CATEGORY_NAME_ID_MAP, )
 from labtest.models import (LabTest, )
 from inventory.models import PriceChange, Inventory as InventoryModel, Documents
 from cultivar.models import (Cultivar, )
 from integration.crm import (get_labtest, search_query, get_record, )
-from inventory.utils import (get_item_tax, )
-from integration.apps.aws import (upload_compressed_file_stream_to_s3, )
+from inventory.utils import (get_item_tax, get_inventory_version, bump_inventory_version,
+                             get_documents_media, get_inventory_media_flags, INVENTORY_MEDIA_FIELDS, )
+from integration.apps.aws import (upload_compressed_file_stream_to_s3, get_s3_output_url_unsigned,
+                                  get_s3_object_metadata, upload_compressed_file_streams_to_s3, )
 from integration.box import (upload_file_stream, create_folder,
                              get_preview_url, update_file_version,
                              get_thumbnail_url, get_inventory_folder_id,
                              get_file_from_link, get_thumbnail_url, get_folder_items,
                              get_file_information, )
 from fee_variable.models import *
+from core.mixins.helpers import (bulk_upsert, chunk, )
+from core.cache import (TTLCache, get_redis_connection, )
 
 
-def get_inventory_obj(inventory_name):
+def _build_inventory_obj(inventory_name):
     """
-    Return pyzoho.inventory object.
+    Build pyzoho.inventory object, storing refreshed tokens in db.
+    Return (inventory, access_expiry).
     """
     try:
         token = Integration.objects.get(name=inventory_name)
@@ -68,6 +87,7 @@ def get_inventory_obj(inventory_name):
         inventory_name=inventory_name
     )
     if inventory.refreshed:
+        access_expiry = inventory.ACCESS_EXPIRY[0]
         Integration.objects.update_or_create(
             name=inventory_name,
             defaults={
@@ -79,7 +99,16 @@ def get_inventory_obj(inventory_name):
                 "refresh_token":inventory.REFRESH_TOKEN
                 }
         )
-    return inventory
+    return inventory, access_expiry
+
+INVENTORY_CLIENT_POOL = ClientPool(_build_inventory_obj)
+
+def get_inventory_obj(inventory_name):
+    """
+    Return pyzoho.inventory object.
+    Client is shared per organization within the process.
+    """
+    return INVENTORY_CLIENT_POOL.get(inventory_name)
 
 def get_vendor_id(inventory_obj, vendor_name):
     """
@@ -302,6 +331,72 @@ def get_inventory_metadata(inventory_name, params={}):
     inventory = get_inventory_obj(inventory_name)
     return inventory.get_metadata(params=params)
 
+INVENTORY_METADATA_FIELDS = ('Tags', 'Marketplace Status', 'Grade')
+INVENTORY_METADATA_CACHE = TTLCache(maxsize=32, ttl=INVENTORY_METADATA_MEMORY_CACHE_TTL)
+
+def get_inventory_metadata_cache_key(inventory_name, label):
+    return f'inventory:metadata:{inventory_name}:{label}'
+
+def refresh_inventory_metadata_cache(inventory_name, labels=INVENTORY_METADATA_FIELDS):
+    """
+    Fetch custom field options from Zoho Inventory and cache them in redis
+    and memory. Return {label: {'values': [...], 'refreshed_at': ...}}.
+    """
+    try:
+        metadata = get_inventory_metadata(inventory_name)
+    except Exception as exc:
+        metadata = exc
+    if not isinstance(metadata, dict) or 'custom_fields' not in metadata:
+        print({'inventory_name': inventory_name, 'error': metadata})
+        return None
+    refreshed_at = timezone.now().isoformat()
+    response = {
+        label: {
+            'values': [
+                val['name']
+                for f in metadata['custom_fields'] if f['label'] == label
+                for val in f.get('values', [])
+            ],
+            'refreshed_at': refreshed_at,
+        }
+        for label in labels
+    }
+    try:
+        pipe = get_redis_connection().pipeline()
+        for label, data in response.items():
+            pipe.setex(get_inventory_metadata_cache_key(inventory_name, label), INVENTORY_METADATA_CACHE_TTL, json.dumps(data))
+        pipe.execute()
+    except Exception as exc:
+        print(exc)
+    for label, data in response.items():
+        INVENTORY_METADATA_CACHE.set(get_inventory_metadata_cache_key(inventory_name, label), data)
+    return response
+
+def get_cached_inventory_field_values(inventory_name, label):
+    """
+    Return {'values': [...], 'refreshed_at': ...} of a custom field from
+    memory or redis, Zoho Inventory is only called on a cold cache.
+    """
+    key = get_inventory_metadata_cache_key(inventory_name, label)
+    data = INVENTORY_METADATA_CACHE.get(key)
+    if data is not None:
+        return data
+    try:
+        cached = get_redis_connection().get(key)
+    except Exception as exc:
+        print(exc)
+        cached = None
+    if cached:
+        data = json.loads(cached)
+    else:
+        data = (refresh_inventory_metadata_cache(inventory_name) or {}).get(label)
+        if data is None:
+            # Keep the failure in memory only so Zoho Inventory is retried
+            # after INVENTORY_METADATA_MEMORY_CACHE_TTL.
+            data = {'values': [], 'refreshed_at': None}
+    INVENTORY_METADATA_CACHE.set(key, data)
+    return data
+
 def get_inventory_name(item_id):
     """
     Get inventory name.
@@ -335,6 +430,17 @@ def get_cultivar_from_db(cultivar_name):
     except Cultivar.DoesNotExist:
         return None
 
+def get_cultivars_from_db(cultivar_names):
+    """
+    Return cultivars from db mapped by cultivar name.
+    """
+    cultivars = dict()
+    if cultivar_names:
+        qs = Cultivar.objects.filter(cultivar_name__in=set(cultivar_names)).order_by('pk')
+        for cultivar in qs:
+            cultivars.setdefault(cultivar.cultivar_name, cultivar)
+    return cultivars
+
 def get_labtest_from_db(labtest_sample_id):
     """
     Return labtest from db.
@@ -348,6 +454,17 @@ def get_labtest_from_db(labtest_sample_id):
         print(exc)
         return None
 
+def get_labtests_from_db(labtest_sample_ids):
+    """
+    Return labtests from db mapped by sample id.
+    """
+    labtests = dict()
+    if labtest_sample_ids:
+        qs = LabTest.objects.filter(Sample_I_D__in=set(labtest_sample_ids)).order_by('pk')
+        for labtest in qs:
+            labtests.setdefault(labtest.Sample_I_D, labtest)
+    return labtests
+
 def get_vendor_from_crm(vendor_name):
     """
     Get inventory vendor from crm.
@@ -384,8 +501,8 @@ def get_pre_tax_price(record):
         try:
             return float(round(Decimal(str(record['price'])) - tax, 6))
         except Exception as e:
-            print(f'tax value: {tax:r}')
-            print(f'price value: {record.get("price"):r}')
+            print(f'tax value: {tax!r}')
+            print(f'price value: {record.get("price")!r}')
             print(e)
     # Issue:- It will call Books API multiple times.
     # taxes = get_tax_rates()
@@ -394,13 +511,57 @@ def get_pre_tax_price(record):
     # elif 'Trim' in record['category_name']:
     #     return record['price'] - taxes[ESTIMATE_TAXES['Trim']]
 
-def crop_image_to_aspect_ratio(compressed_file):
+def get_pre_tax_prices(records):
+    """
+    Return list of pre tax prices for a page of records.
+    Item tax is computed once per distinct category and biomass input.
+    """
+    taxes = dict()
+    prices = list()
+    for record in records:
+        if record.get('cf_cultivation_tax', ''):
+            try:
+                prices.append(get_pre_tax_price(record))
+            except Exception as exc:
+                print({'item_id': record.get('item_id'), 'error': exc})
+                prices.append(None)
+            continue
+        key = (
+            record.get('category_name'),
+            record.get('cf_biomass', ''),
+            record.get('cf_raw_material_input_g'),
+            record.get('cf_batch_qty_g'),
+        )
+        if key not in taxes:
+            try:
+                taxes[key] = get_item_tax(
+                    record.get('category_name'),
+                    biomass_type=record.get('cf_biomass', ''),
+                    biomass_input_g=Decimal(record.get('cf_raw_material_input_g')) if record.get('cf_raw_material_input_g') else None,
+                    total_batch_output=Decimal(record.get('cf_batch_qty_g')) if record.get('cf_batch_qty_g') else None ,
+                )
+            except Exception as exc:
+                print({'item_id': record.get('item_id'), 'error': exc})
+                taxes[key] = None
+        tax = taxes[key]
+        price = None
+        if isinstance(tax, Decimal):
+            try:
+                price = float(round(Decimal(str(record['price'])) - tax, 6))
+            except Exception as e:
+                print(f'tax value: {tax!r}')
+                print(f'price value: {record.get("price")!r}')
+                print(e)
+        prices.append(price)
+    return prices
+
+def crop_to_aspect_ratio(img):
+    """
+    Return PIL image cropped to INVENTORY_IMAGE_CROP_RATIO, None if
+    image already has the required ratio.
+    """
     crop_x = 0
     crop_y = 0
-
-    img = Image.open(compressed_file)
-    if img.mode in ("RGBA", "P"):
-        img = img.convert("RGB")
     o_width, o_height = img.size
     img_ratio = round(o_width/o_height, 5)
     img_crop_ratio = round(INVENTORY_IMAGE_CROP_RATIO, 5) 
@@ -414,8 +575,15 @@ def crop_image_to_aspect_ratio(compressed_file):
             n_width = int(round(o_height*INVENTORY_IMAGE_CROP_RATIO))
             crop_x = int((o_width - n_width)/2)
 
-        cropped_img = img.crop((crop_x, crop_y, crop_x+n_width, crop_y+n_height))
+        return img.crop((crop_x, crop_y, crop_x+n_width, crop_y+n_height))
+    return None
 
+def crop_image_to_aspect_ratio(compressed_file):
+    img = Image.open(compressed_file)
+    if img.mode in ("RGBA", "P"):
+        img = img.convert("RGB")
+    cropped_img = crop_to_aspect_ratio(img)
+    if cropped_img:
         file_obj = BytesIO()
         cropped_img.save(file_obj, format='JPEG')
         return file_obj
@@ -456,9 +624,67 @@ def get_s3_thumbnail_url(compressed_file, folder_name, file_name):
     return url
 
 
+SOURCE_HASH_METADATA_KEY = 'source-sha256'
+
+def get_image_renditions(content):
+    """
+    Return mobile and thumbnail jpeg renditions of image content,
+    both built from a single decode of the cropped image.
+    """
+    img = Image.open(BytesIO(content))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    img = crop_to_aspect_ratio(img) or img
+    resize_width = 1280
+    resize_height = int(round(resize_width/INVENTORY_IMAGE_CROP_RATIO))
+    mobile_img = img.resize((resize_width, resize_height))
+    thumbnail_img = img.copy()
+    thumbnail_img.thumbnail((160, 160))
+    renditions = dict()
+    for name, rendition in (('mobile', mobile_img), ('thumbnail', thumbnail_img)):
+        file_obj = BytesIO()
+        rendition.save(file_obj, format='JPEG')
+        renditions[name] = file_obj
+    return renditions
+
+def process_inventory_document(inventory_name, item_id, folder_name, document):
+    """
+    Download inventory document and upload it to s3, creating mobile and
+    thumbnail renditions for the primary image. Upload is skipped when
+    the stored objects were built from the same source bytes.
+    Return (attachment_order, url, thumbnail_url, mobile_url).
+    """
+    file_name = document['file_name'].split('.')
+    file_name = f"{document['document_id']}-{file_name[0]}.jpg"
+    s3_keys = {'original': '/'.join(('inventory', folder_name, file_name))}
+    if document['attachment_order'] == 1: # Limit upload image to primary.
+        for name in ('mobile', 'thumbnail'):
+            s3_keys[name] = '/'.join(('inventory', folder_name, f"{file_name.split('.')[0]}-{name}.jpg"))
+
+    content = get_inventory_document(inventory_name, item_id, document['document_id'])
+    digest = hashlib.sha256(content).hexdigest()
+    is_unchanged = all(
+        (get_s3_object_metadata(key) or {}).get(SOURCE_HASH_METADATA_KEY) == digest
+        for key in s3_keys.values())
+
+    if is_unchanged:
+        urls = {name: get_s3_output_url_unsigned(key, AWS_OUTPUT_BUCKET) for name, key in s3_keys.items()}
+    else:
+        metadata = {SOURCE_HASH_METADATA_KEY: digest}
+        urls = {'original': upload_compressed_file_stream_to_s3(
+            BytesIO(content), s3_keys['original'], content_type='image/jpeg', metadata=metadata)}
+        if 'mobile' in s3_keys:
+            renditions = get_image_renditions(content)
+            rendition_urls = upload_compressed_file_streams_to_s3(
+                [(s3_keys[name], file_obj) for name, file_obj in renditions.items()],
+                content_type='image/jpeg', metadata=metadata)
+            urls.update(zip(renditions.keys(), rendition_urls))
+    return document['attachment_order'], urls['original'], urls.get('thumbnail'), urls.get('mobile')
+
 def check_documents(inventory_name, record):
     """
     Check if record has any documents.
+    Documents are processed concurrently in a bounded thread pool.
     """
     try:
         response = list()
@@ -471,24 +697,20 @@ def check_documents(inventory_name, record):
             # folder_id = create_folder(INVENTORY_BOX_ID, folder_name)
             resp_docs = {}
             print(f"Item {record['sku']} image count: {len(record['documents'] or [])}" )
-            for document in record['documents']:
-
-                file_obj = get_inventory_document(inventory_name, record['item_id'], document['document_id'])
-                file_obj = BytesIO(file_obj)
-                file_name = document['file_name'].split('.')
-                file_name = f"{document['document_id']}-{file_name[0]}.jpg"
-                s3_key = '/'.join(('inventory', folder_name, file_name))
-                cropped_file_obj = crop_image_to_aspect_ratio(file_obj)
-                link = upload_compressed_file_stream_to_s3(file_obj, s3_key, content_type='image/jpeg')
-
-                if document['attachment_order'] == 1: # Limit upload image to primary.
-                    mobile_url = get_s3_mobile_url(cropped_file_obj, folder_name, file_name)
-                    thumbnail_url = get_s3_thumbnail_url(cropped_file_obj, folder_name, file_name)
-
-                # response.append(link)
-                resp_docs[document['attachment_order']] = link
+            # Warm up shared client so worker threads do not hit db for tokens.
+            get_inventory_obj(inventory_name)
+            with ThreadPoolExecutor(max_workers=INVENTORY_DOCUMENT_WORKERS) as executor:
+                futures = [
+                    executor.submit(process_inventory_document, inventory_name, record['item_id'], folder_name, document)
+                    for document in record['documents']]
+                for future in futures:
+                    order, link, thumbnail, mobile = future.result()
+                    if thumbnail:
+                        thumbnail_url = thumbnail
+                    if mobile:
+                        mobile_url = mobile
+                    resp_docs[order] = link
             response = [v for _, v in sorted(resp_docs.items())]
-            return response, thumbnail_url, mobile_url
         return response, thumbnail_url, mobile_url
     except Exception as exc:
         print(exc)
@@ -633,7 +855,7 @@ def get_from_licenses(response, field):
         if result.get('status_code') == 200:
             return result.get('response')[license_id].get(field)
 
-def get_record_data(vendor_name):
+def get_record_data(vendor_name, raise_exception=False):
     """
     Get record data for inventory item from crm.
     """
@@ -648,9 +870,47 @@ def get_record_data(vendor_name):
             return data
         return {}
     except Exception as exc:
+        if raise_exception:
+            raise
         print(exc)
         return {}
 
+VENDOR_DATA_CACHE = TTLCache(maxsize=INVENTORY_VENDOR_CACHE_SIZE, ttl=INVENTORY_VENDOR_CACHE_TTL)
+
+def get_cached_record_data(vendor_name):
+    """
+    Return crm record data for vendor.
+    Data is memoized in process and shared through redis for
+    INVENTORY_VENDOR_CACHE_TTL seconds so a vendor is looked up in
+    crm once per sync window. Vendors missing in crm are cached as {} for
+    INVENTORY_VENDOR_MISS_CACHE_TTL seconds, crm errors are not cached.
+    """
+    data = VENDOR_DATA_CACHE.get(vendor_name)
+    if data is not None:
+        return data
+    key = f'inventory:vendor_data:{vendor_name}'
+    try:
+        cached = get_redis_connection().get(key)
+    except Exception as exc:
+        print(exc)
+        cached = None
+    if cached is not None:
+        data = json.loads(cached)
+        ttl = INVENTORY_VENDOR_CACHE_TTL if data else INVENTORY_VENDOR_MISS_CACHE_TTL
+    else:
+        try:
+            data = get_record_data(vendor_name, raise_exception=True)
+        except Exception as exc:
+            print(exc)
+            return {}
+        ttl = INVENTORY_VENDOR_CACHE_TTL if data else INVENTORY_VENDOR_MISS_CACHE_TTL
+        try:
+            get_redis_connection().setex(key, ttl, json.dumps(data))
+        except Exception as exc:
+            print(exc)
+    VENDOR_DATA_CACHE.set(vendor_name, data, ttl=ttl)
+    return data
+
 def get_inventory_name_from_db(inventory_name):
     """
     Return inventory name
@@ -662,17 +922,139 @@ def get_inventory_name_from_db(inventory_name):
     elif 'efn' in inventory_name:
         return 'EFN'
 
-def fetch_inventory_from_list(inventory_name, inventory_list, is_composite=False):
+def get_page_documents_media(records):
+    """
+    Return documents media of every sku on a page in one query.
+    """
+    return get_documents_media({record['sku'] for record in records if record.get('sku')})
+
+def enrich_inventory_page(inventory_name, records, is_composite=False):
+    """
+    Enrich a page of inventory records in memory.
+    Cultivars and labtests are resolved with one query per page.
+    """
+    if is_composite:
+        composite_records = list()
+        for record in records:
+            try:
+                record.update(get_composite_item(inventory_name, item_id=record['item_id']))
+                composite_records.append(record)
+            except Exception as exc:
+                print({'item_id': record.get('item_id'), 'error': exc})
+        records = composite_records
+    cultivars = get_cultivars_from_db(
+        [r['cf_strain_name'] for r in records if r.get('cf_strain_name')])
+    labtests = get_labtests_from_db(
+        [r['cf_lab_test_sample_id'] for r in records if r.get('cf_lab_test_sample_id')])
+    pre_tax_prices = get_pre_tax_prices(records)
+    media = get_page_documents_media(records)
+    enriched = list()
+    for record, pre_tax_price in zip(records, pre_tax_prices):
+        try:
+            record['pre_tax_price'] = pre_tax_price
+            if cultivars.get(record.get('cf_strain_name')):
+                record['cultivar'] = cultivars[record['cf_strain_name']]
+            if labtests.get(record.get('cf_lab_test_sample_id')):
+                record['labtest'] = labtests[record['cf_lab_test_sample_id']]
+            documents, thumbnail_url, mobile_url = check_documents(inventory_name, record)
+            record['documents'] = documents
+            record['thumbnail_url'] = thumbnail_url
+            record['mobile_url'] = mobile_url
+            record.update(get_inventory_media_flags(documents, media.get(record.get('sku'))))
+            if record.get('cf_vendor_name'):
+                record.update(get_cached_record_data(record['cf_vendor_name']))
+            if record.get('category_name'):
+                record['parent_category_name'] = get_parent_category(record['category_name'])
+            record['inventory_name'] = get_inventory_name_from_db(inventory_name)
+            enriched.append(record)
+        except Exception as exc:
+            print({
+                'item_id': record.get('item_id'),
+                'error': exc
+                })
+    return enriched
+
+def bulk_upsert_inventory_page(records):
+    """
+    Write a page of enriched records to db.
+    Records sharing the same set of fields are written with a single
+    INSERT .. ON CONFLICT statement, so fields missing from a record keep
+    their db value like update_or_create. Falls back to per item
+    update_or_create if a bulk write fails.
+    """
+    records_by_id = {record['item_id']: record for record in records}
+    groups = dict()
+    for record in records_by_id.values():
+        groups.setdefault(frozenset(record.keys()), []).append(record)
+    count = 0
+    for fields, group in groups.items():
+        try:
+            objs = [InventoryModel(**record) for record in group]
+            with transaction.atomic():
+                count += bulk_upsert(InventoryModel, objs, update_fields=list(fields))
+        except Exception as exc:
+            print({'error': exc, 'fallback_items': len(group)})
+            for record in group:
+                try:
+                    InventoryModel.objects.update_or_create(
+                        item_id=record['item_id'],
+                        defaults=record)
+                    count += 1
+                except Exception as exc:
+                    print({
+                        'item_id': record['item_id'],
+                        'error': exc
+                        })
+    if count:
+        bump_inventory_version()
+    return count
+
+def sync_inventory_page(inventory_name, records, page=None, is_composite=False):
+    """
+    Enrich and bulk write a page of inventory records.
+    Return page stats.
+    """
+    start = time.time()
+    enriched = enrich_inventory_page(inventory_name, records, is_composite=is_composite)
+    enriched_at = time.time()
+    written = bulk_upsert_inventory_page(enriched)
+    stats = {
+        'inventory_name': inventory_name,
+        'page': page,
+        'fetched': len(records),
+        'enriched': len(enriched),
+        'written': written,
+        'enrich_time': round(enriched_at - start, 3),
+        'write_time': round(time.time() - enriched_at, 3),
+    }
+    print(stats)
+    return stats
+
+def fetch_inventory_from_list(inventory_name, inventory_list, is_composite=False, bulk=False):
     """
     Fetch list of inventory from Zoho Inventory.
     """
     cultivar = None
+    if bulk:
+        stats = list()
+        for page, item_ids in enumerate(chunk(inventory_list, INVENTORY_SYNC_PAGE_SIZE), start=1):
+            records = list()
+            for item_id in item_ids:
+                if is_composite:
+                    record = get_composite_item(inventory_name, item_id=item_id)
+                else:
+                    record = get_inventory_item(inventory_name=inventory_name, item_id=item_id)
+                if isinstance(record, dict) and record.get('item_id'):
+                    records.append(record)
+            stats.append(sync_inventory_page(inventory_name, records, page=page))
+        return stats
     for record in inventory_list:
         if is_composite:
             records = get_composite_item(inventory_name, item_id=record)
         else:
             record = get_inventory_item(inventory_name=inventory_name, item_id=record)
         try:
+            media = get_page_documents_media([record])
             try:
                 record['pre_tax_price'] = get_pre_tax_price(record)
             except KeyError:
@@ -693,9 +1075,10 @@ def fetch_inventory_from_list(inventory_name, inventory_list, is_composite=False
             record['documents'] = documents
             record['thumbnail_url'] = thumbnail_url
             record['mobile_url'] = mobile_url
+            record.update(get_inventory_media_flags(documents, media.get(record.get('sku'))))
             try:
                 if record['cf_vendor_name']:
-                    record.update(get_record_data(record['cf_vendor_name']))
+                    record.update(get_cached_record_data(record['cf_vendor_name']))
             except KeyError:
                 pass
             try:
@@ -714,15 +1097,18 @@ def fetch_inventory_from_list(inventory_name, inventory_list, is_composite=False
                 })
             continue
 
-def fetch_inventory(inventory_name, days=1, price_data=None, is_composite=False):
+def fetch_inventory(inventory_name, days=1, price_data=None, is_composite=False, bulk=False):
     """
     Fetch latest inventory from Zoho Inventory.
+    With bulk=True every page is enriched in memory and written with
+    a bulk upsert, returning per page stats.
     """
     cultivar = None
     yesterday = datetime.now() - timedelta(days=days)
     date = datetime.strftime(yesterday, '%Y-%m-%dT%H:%M:%S-0000')
     has_more = True
     page = 0
+    stats = list()
     while has_more:
         if is_composite:
             records = get_composite_item(inventory_name)
@@ -730,6 +1116,11 @@ def fetch_inventory(inventory_name, days=1, price_data=None, is_composite=False)
             records = get_inventory_items(inventory_name, params={'page': page, 'last_modified_time': date})
         has_more = records['page_context']['has_more_page']
         page = records['page_context']['page'] + 1
+        if bulk:
+            stats.append(sync_inventory_page(
+                inventory_name, records['items'], page=page - 1, is_composite=is_composite))
+            continue
+        media = get_page_documents_media(records['items'])
         for record in records['items']:
             try:
                 if is_composite:
@@ -754,9 +1145,10 @@ def fetch_inventory(inventory_name, days=1, price_data=None, is_composite=False)
                 record['documents'] = documents
                 record['thumbnail_url'] = thumbnail_url
                 record['mobile_url'] = mobile_url
+                record.update(get_inventory_media_flags(documents, media.get(record.get('sku'))))
                 try:
                     if record['cf_vendor_name']:
-                        record.update(get_record_data(record['cf_vendor_name']))
+                        record.update(get_cached_record_data(record['cf_vendor_name']))
                 except KeyError:
                     pass
                 try:
@@ -775,6 +1167,8 @@ def fetch_inventory(inventory_name, days=1, price_data=None, is_composite=False)
                     'error': exc
                     })
                 continue
+    if bulk:
+        return stats
 
 def fetch_inventory_item_fields(inventory_name, fields=(), days=None, is_composite=False):
     """
@@ -802,6 +1196,7 @@ def fetch_inventory_item_fields(inventory_name, fields=(), days=None, is_composi
             print({'error': e, 'response': records,})
             return None
         else:
+            media = get_page_documents_media(records['items']) if 'documents' in fields else dict()
             for record in records['items']:
                 try:
                     if is_composite:
@@ -832,12 +1227,13 @@ def fetch_inventory_item_fields(inventory_name, fields=(), days=None, is_composi
                         record['documents'] = documents
                         record['thumbnail_url'] = thumbnail_url
                         record['mobile_url'] = mobile_url
+                        record.update(get_inventory_media_flags(documents, media.get(record.get('sku'))))
 
 
                     if any(f in fields for f in ('county_grown', 'appellation', 'nutrients', 'ethics_and_certification')):
                         try:
                             if record['cf_vendor_name']:
-                                record.update(get_record_data(record['cf_vendor_name']))
+                                record.update(get_cached_record_data(record['cf_vendor_name']))
                         except KeyError:
                             pass
 
@@ -849,9 +1245,13 @@ def fetch_inventory_item_fields(inventory_name, fields=(), days=None, is_composi
                             pass
 
                     record['inventory_name'] = get_inventory_name_from_db(inventory_name)
-                    update_data = {k: v for k, v in record.items() if k in fields}
+                    update_fields = set(fields)
+                    if 'documents' in fields:
+                        update_fields.update(INVENTORY_MEDIA_FIELDS)
+                    update_data = {k: v for k, v in record.items() if k in update_fields}
                     qs = InventoryModel.objects.filter(item_id=record['item_id'])
-                    qs.update(**update_data)
+                    if qs.update(**update_data):
+                        bump_inventory_version()
                     # update_price_change(price_data, record)
                 except Exception as exc:
                     print({
@@ -895,9 +1295,11 @@ def sync_inventory(inventory_name, record):
         record['documents'] = documents
         record['thumbnail_url'] = thumbnail_url
         record['mobile_url'] = mobile_url
+        media = get_page_documents_media([record])
+        record.update(get_inventory_media_flags(documents, media.get(record.get('sku'))))
         try:
             if record['cf_vendor_name']:
-                record.update(get_record_data(record['cf_vendor_name']))
+                record.update(get_cached_record_data(record['cf_vendor_name']))
         except KeyError:
             pass
         try:
@@ -960,45 +1362,117 @@ def get_average_thc(inventory):
         print('exception while calculating avg thc', e)
         return 0
     
+INVENTORY_SUMMARY_CATEGORIES = ['Processing', 'Vegging,Flowering,Under Contract', 'Sold']
+
+def get_inventory_summary_aggregates(statuses):
+    """
+    Return aggregate expressions of inventory summary.
+    """
+    quantity_field = 'cf_quantity_estimate' if statuses in INVENTORY_SUMMARY_CATEGORIES else 'actual_available_stock'
+    average_thc_filter = Q(
+        cf_cfi_published=True,
+        status='active',
+        actual_available_stock__gt=0,
+        labtest__Total_THC__gt=0,
+    )
+    aggregates = {
+        'total_thc_min': Min('labtest__Total_THC'),
+        'total_thc_max': Max('labtest__Total_THC'),
+        'thc_summation': Sum(F('actual_available_stock') * F('labtest__Total_THC'), filter=average_thc_filter),
+        'thc_quantity_sum': Sum('actual_available_stock', filter=average_thc_filter),
+        'total_quantity': Sum(quantity_field, filter=Q(inventory_name__in=['EFD','EFL','EFN'])),
+        'total_value': Sum(F(quantity_field)*F('pre_tax_price')),
+        'average': Avg('pre_tax_price'),
+        'sku_count': Count('sku', distinct=True),
+        'null_sku_count': Count('pk', filter=Q(sku__isnull=True)),
+    }
+    for category in ['Tops', 'Smalls', 'Trim']:
+        aggregates[category.lower() + '_quantity'] = Sum(
+            quantity_field, filter=Q(cf_cannabis_grade_and_category__contains=category))
+    return aggregates
+
+def build_inventory_summary(result):
+    """
+    Return inventory summary from aggregate result, an empty result gives the
+    summary of an empty queryset.
+    """
+    result = result or dict()
+    response = dict()
+    response['total_thc_min'] = result.get('total_thc_min')
+    response['total_thc_max'] = result.get('total_thc_max')
+    try:
+        response['average_thc'] = result['thc_summation']/result['thc_quantity_sum']
+    except Exception as e:
+        if result.get('thc_quantity_sum') is not None:
+            print('exception while calculating avg thc', e)
+        response['average_thc'] = 0
+    response['total_quantity'] = result.get('total_quantity')
+    for category in ['Tops', 'Smalls', 'Trim']:
+        response[category.lower() + '_quantity'] = result.get(category.lower() + '_quantity')
+    response['total_value'] = result.get('total_value')
+    response['average'] = result.get('average')
+    # distinct('sku') counts null sku as one batch.
+    response['batch_varities'] = (result.get('sku_count') or 0) + (1 if result.get('null_sku_count') else 0)
+    return response
+
 def get_inventory_summary(inventory, statuses):
     """
-    Return inventory summary
+    Return inventory summary.
+    All metrics are computed in a single aggregate query.
     """
     try:
-        response = dict()
-        categories = ['Processing',
-                      'Vegging,Flowering,Under Contract', 'Sold']
-        labtest = LabTest.objects.filter(id__in=inventory.values('labtest_id'))
-        response['total_thc_min'] = labtest.aggregate(Min('Total_THC'))['Total_THC__min']
-        response['total_thc_max'] = labtest.aggregate(Max('Total_THC'))['Total_THC__max']
-        response['average_thc'] = get_average_thc(inventory)
-        if statuses in categories:
-            response['total_quantity'] = inventory.filter(inventory_name__in=['EFD','EFL','EFN']).aggregate(Sum('cf_quantity_estimate'))['cf_quantity_estimate__sum']
-            for category in ['Tops', 'Smalls', 'Trim']:
-                response[category.lower() + '_quantity'] = inventory.filter(
-                    cf_cannabis_grade_and_category__contains=category).aggregate(
-                        Sum('cf_quantity_estimate'))['cf_quantity_estimate__sum']
-            response['total_value'] = inventory.filter().aggregate(
-                    total=Sum(F('cf_quantity_estimate')*F('pre_tax_price')))['total']
-        else:
-            response['total_quantity'] = inventory.filter(inventory_name__in=['EFD','EFL','EFN']).aggregate(Sum('actual_available_stock'))['actual_available_stock__sum']
-            for category in ['Tops', 'Smalls', 'Trim']:
-                response[category.lower() + '_quantity'] = inventory.filter(
-                    cf_cannabis_grade_and_category__contains=category).aggregate(
-                        Sum('actual_available_stock'))['actual_available_stock__sum']
-            response['total_value'] = inventory.filter().aggregate(
-                    total=Sum(F('actual_available_stock')*F('pre_tax_price')))['total']
-        response['average'] = inventory.aggregate(Avg('pre_tax_price'))['pre_tax_price__avg']
-        response['batch_varities'] = inventory.order_by().distinct('sku').count()
-        return response
+        result = inventory.order_by().aggregate(**get_inventory_summary_aggregates(statuses))
+        return build_inventory_summary(result)
     except Exception as exc:
         return {'error': f'{exc}'}
-            
-def get_category_count(params, filtered_qs):
+
+def get_grouped_inventory_summary(inventory, group_by, statuses=None):
     """
-    Return category count.
+    Return {group value: inventory summary} for every group in one GROUP BY
+    query. `group_by` is a field name or a tuple of field names (keys are
+    tuples then). Use get_county_inventory_summary for county_grown.
     """
+    fields = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+    aggregates = get_inventory_summary_aggregates(statuses)
+    qs = inventory.order_by().values(*fields).annotate(**aggregates)
     response = dict()
+    for row in qs:
+        key = row[fields[0]] if isinstance(group_by, str) else tuple(row[f] for f in fields)
+        response[key] = build_inventory_summary(row)
+    return response
+
+def get_county_inventory_summary(inventory, statuses=None):
+    """
+    Return {county: inventory summary}, items are grouped on unnest(county_grown)
+    so an item counts towards every county it was grown in.
+    """
+    inventory = inventory.annotate(
+        summary_county=Func(F('county_grown'), function='unnest', output_field=CharField()),
+    )
+    return get_grouped_inventory_summary(inventory, 'summary_county', statuses)
+
+def get_params_cache_key(prefix, params):
+    """
+    Return cache key for normalized query params.
+    """
+    normalized = sorted((str(k), str(v).strip()) for k, v in (params or {}).items())
+    return f'{prefix}:' + hashlib.sha1(json.dumps(normalized).encode('utf-8')).hexdigest()
+
+def get_category_count(params, filtered_qs, cache_ttl=INVENTORY_CATEGORY_COUNT_CACHE_TTL):
+    """
+    Return category count.
+    Counts are computed in one query and cached in redis for cache_ttl
+    seconds per normalized filter params.
+    """
+    cache_key = None
+    if cache_ttl and params is not None:
+        cache_key = get_params_cache_key(f'inventory:category_count:{get_inventory_version()}', params)
+        try:
+            cached = get_redis_connection().get(cache_key)
+            if cached:
+                return json.loads(cached)
+        except Exception as exc:
+            print(exc)
     categories = {
         'Available': ('Available',),
         'Pending_Sale': ('Pending Sale',),
@@ -1007,8 +1481,15 @@ def get_category_count(params, filtered_qs):
         'Future_Exchange': ('Vegging', 'Flowering', 'Under Contract',),
         'Market_Intelligence': ('Sold',)
     }
-    for name, category in categories.items():
-        response[name] = filtered_qs.filter(cf_status__in=category).count()
+    response = filtered_qs.order_by().aggregate(**{
+        name: Count('pk', filter=Q(cf_status__in=category))
+        for name, category in categories.items()
+    })
+    if cache_key:
+        try:
+            get_redis_connection().setex(cache_key, cache_ttl, json.dumps(response))
+        except Exception as exc:
+            print(exc)
     return response
 
 def resize_box_images():
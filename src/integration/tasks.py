@@ -4,17 +4,19 @@ All periodic tasks related to integrations.
 """
 from datetime import datetime, timedelta
 from django.core.exceptions import (ObjectDoesNotExist,)
+from django.utils import timezone
 from celery.task import periodic_task
 from celery.schedules import crontab
 from core.celery import app
-from core.settings import (NUMBER_OF_DAYS_TO_FETCH_INVENTORY,PRODUCTION)
+from core.settings import (NUMBER_OF_DAYS_TO_FETCH_INVENTORY, PRODUCTION, INVENTORY_BULK_SYNC)
 
 from drf_api_logger.models import APILogsModel
 
 from inventory.models import (Inventory, )
+from inventory.utils import (rebuild_inventory_facets, )
 from bill.utils import (delete_estimate, )
 from labtest.models import (LabTest, )
-from brand.models import (License, LicenseProfile)
+from brand.models import (License, LicenseProfile, LicenseBuyerSummary, )
 from integration.apps.bcc import (post_licenses_to_crm, )
 from utils.integration_books import (
     trigger_estimate_update_workflow,
@@ -24,8 +26,9 @@ from utils.integration_books import (
 from .crm import (insert_users, fetch_labtests, create_records, delete_record,
                   update_in_crm, update_license, search_query)
 from .crm.get_records import (get_account_associated_cultivars_of_interest)
-from .inventory import (fetch_inventory, fetch_inventory_from_list, fetch_inventory_item_fields)
-from .books import (send_estimate_to_sign, )
+from .inventory import (fetch_inventory, fetch_inventory_from_list, fetch_inventory_item_fields,
+                        refresh_inventory_metadata_cache, )
+from .books import (send_estimate_to_sign, invalidate_books_documents, )
 from .crm import (fetch_cultivars, fetch_licenses, insert_records)
 from  .sign import (upload_pdf_box,)
 from .box import(
@@ -62,11 +65,16 @@ def fetch_inventory_on_interval():
         fetch_labtests(days=days)
         licenses = fetch_licenses()
         labtests = LabTest.objects.all().count()
-        fetch_inventory('inventory_efd', days=days, price_data=price_data)
+        fetch_inventory('inventory_efd', days=days, price_data=price_data, bulk=INVENTORY_BULK_SYNC)
         # Commenting below only for staging. We do not have test book organization for staging.
         # if PRODUCTION:
         #     fetch_inventory('inventory_efl', days=days, price_data=price_data)
-        fetch_inventory('inventory_efl', days=days, price_data=price_data)
+        fetch_inventory('inventory_efl', days=days, price_data=price_data, bulk=INVENTORY_BULK_SYNC)
+        try:
+            refresh_inventory_metadata_cache('inventory_efd')
+        except Exception as exc:
+            print({'inventory_name': 'inventory_efd', 'error': exc})
+        rebuild_inventory_facets()
         inventory_after = Inventory.objects.all().count()
         return {'status_code': 200,
                 'labtest': labtests,
@@ -96,6 +104,14 @@ def fetch_inventory_item_fields_task(fields=(), days=None):
                 'error': exc}
 
 
+@periodic_task(run_every=(crontab(minute='*/30')), options={'queue': 'general'})
+def refresh_inventory_metadata_task():
+    """
+    Refresh cached Zoho Inventory custom field options.
+    """
+    refresh_inventory_metadata_cache('inventory_efd')
+
+
 @app.task(queue="general")
 def send_estimate(organization_name, estimate_id, contact_id):
     """
@@ -156,8 +172,9 @@ def upload_agreement_pdf_to_box(request_id, folder_id, file_name, license_number
                 obj.save()
 
 @app.task(queue="urgent")
-def fetch_inventory_from_list_task(inventory_name, inventory_list, is_composite=False):
-    fetch_inventory_from_list(inventory_name, inventory_list, is_composite)
+def fetch_inventory_from_list_task(inventory_name, inventory_list, is_composite=False, bulk=False):
+    fetch_inventory_from_list(inventory_name, inventory_list, is_composite, bulk=bulk)
+    rebuild_inventory_facets()
 
 @app.task(queue="general")
 def update_account_cultivars_of_interest_in_crm(license_profile_id):
@@ -195,6 +212,10 @@ def trigger_salesorder_update_workflow_task(books_name):
 @app.task(queue="urgent")
 def trigger_invoice_update_workflow_task(books_name):
     trigger_invoice_update_workflow(books_name)
+    invalidate_books_documents(books_name, 'customer_payment')
+    # Stored summaries keep being served and are refreshed by
+    # refresh_stale_buyer_summaries_task or on next read.
+    LicenseBuyerSummary.objects.filter(books_name__in=(books_name, 'all')).update(dirty_at=timezone.now())
 
 @app.task(queue="urgent")
 def trigger_all_workflow(books_name):
@@ -2,7 +2,6 @@
 Integration views
 """
 from argparse import Action
-import time
 from datetime import (datetime, timedelta)
 import base64
 import ast
@@ -34,6 +33,7 @@ from integration.box import(
     )
 from integration.inventory import (
     get_inventory_item, get_inventory_items,)
+from integration.fanout import (fan_out, fan_out_orgs, )
 from integration.crm import (
     search_query, get_picklist,
     list_crm_contacts, create_lead,
@@ -101,7 +101,7 @@ from brand.models import (License, Sign, LicenseProfile)
 from bill.models import (Estimate, LineItem)
 from integration.campaign import (create_campaign, )
 from fee_variable.models import (CampaignVariable, )
-from integration.apps.aws import (get_boto_client, create_presigned_url)
+from integration.apps.aws import (get_cached_boto_client, create_presigned_url)
 from bill.utils import (save_estimate, )
 from twilio.twiml.messaging_response import MessagingResponse
 
@@ -368,9 +368,12 @@ class LicenseBillingAndAccountingAPI(APIView):
                 params=params))
         else:
             if organization_name == 'all':
-                result = dict()
-                for books_name in BOOKS_ORGANIZATION_LIST:
-                    result[books_name] = self.list_func(books_name, params=params)
+                # Resolve license before fan out so threads share it.
+                if 'license_id' in request.query_params:
+                    self.license_obj
+                result = fan_out_orgs(
+                    lambda books_name: self.list_func(books_name, params=dict(params)),
+                    BOOKS_ORGANIZATION_LIST)
                 return Response(result)
             else:
                 response = self.list_func(organization_name, params=params)
@@ -1071,18 +1074,23 @@ class AccountSummaryView(APIView):
         vendor = request.query_params.get('vendor_name')
         try:
             if organization_name == 'all':
-                org_result = dict()
-                for org in BOOKS_ORGANIZATION_LIST:
-                    org_result[org] = {"Available_Credits":get_available_credit(org,vendor),
-                                       "Overdue_Bills": get_unpaid_bills(org,vendor),
-                                       "Outstanding_Invoices": get_unpaid_invoices(org,vendor)}
-                    time.sleep(0.5)
-                if org_result:
-                    return Response({
-                        "Available_Credits": sum([i['Available_Credits'] for i in org_result.values()]),
-                        "Overdue_Bills": sum([i['Overdue_Bills'] for i in org_result.values()]),
-                        "Outstanding_Invoices": sum([i['Outstanding_Invoices'] for i in org_result.values()])
-                    })
+                summary_funcs = {
+                    "Available_Credits": get_available_credit,
+                    "Overdue_Bills": get_unpaid_bills,
+                    "Outstanding_Invoices": get_unpaid_invoices,
+                }
+                results, errors = fan_out({
+                    (org, key): (org, func, (org, vendor), {})
+                    for org in BOOKS_ORGANIZATION_LIST
+                    for key, func in summary_funcs.items()
+                })
+                response = {
+                    key: sum([v for (org, k), v in results.items() if k == key])
+                    for key in summary_funcs
+                }
+                if errors:
+                    response['errors'] = {f'{org}:{key}': error for (org, key), error in errors.items()}
+                return Response(response)
             total_unpaid_bills = get_unpaid_bills(organization_name, vendor)
             total_credits = get_available_credit(organization_name, vendor)
             total_unpaid_invoices = get_unpaid_invoices(organization_name, vendor)    
@@ -1479,7 +1487,7 @@ class CampaignView(APIView):
         file_name = f'{campaign_subject}.html'
         file_obj = BytesIO(bytes(content_data.encode('utf-8')))
 
-        client = get_boto_client('s3')
+        client = get_cached_boto_client('s3')
         response = client.upload_fileobj(file_obj, CAMPAIGN_HTML_BUCKET, file_name)
         response = create_presigned_url(CAMPAIGN_HTML_BUCKET, file_name)
         if response['status_code'] == 0:
@@ -0,0 +1,92 @@
+import operator
+import random
+import statistics
+import time
+from functools import reduce
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from inventory.models import (Inventory, )
+from inventory.views import (DataFilter, INVENTORY_SEARCH_FIELDS, )
+
+STRAINS = ('Blue Dream', 'OG Kush', 'Sour Diesel', 'Wedding Cake', 'Gelato', 'Zkittlez', 'Runtz', 'Gorilla Glue')
+CATEGORIES = ('Flower - Tops', 'Flower - Small', 'Trim', 'Isolates - CBD', 'Concentrates - Wax')
+
+
+class Command(BaseCommand):
+    """
+    Compare icontains search (sequential scan) with DataFilter search on a
+    seeded inventory table. Seeded rows are rolled back.
+    """
+    help = 'Benchmark inventory free text search.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('terms', nargs='*', default=['dream', 'og ku', 'wedd', 'EFD-1234'])
+
+    def seed(self, rows):
+        now = timezone.now()
+        objs = (
+            Inventory(
+                item_id=f'benchmark-{i}',
+                name=f'{random.choice(STRAINS)} {random.choice(CATEGORIES)} {i}',
+                sku=f'EFD-{i}',
+                cf_strain_name=random.choice(STRAINS),
+                category_name=random.choice(CATEGORIES),
+                cf_client_code=f'C{i % 900:04d}',
+                cf_vendor_name=f'Vendor {i % 500}',
+                vendor_name=f'Vendor {i % 500}',
+                created_time=now,
+                last_modified_time=now,
+                price=0,
+                purchase_rate=0,
+                tax_percentage=0,
+                cf_cfi_published=True,
+            )
+            for i in range(rows)
+        )
+        batch = list()
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) == 5000:
+                Inventory.objects.bulk_create(batch)
+                batch = list()
+        Inventory.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE inventory_inventory;')
+
+    def time_query(self, func, repeat):
+        timings = list()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = len(func())
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), count
+
+    def legacy(self, term):
+        return Inventory.objects.filter(
+            reduce(operator.or_, (Q(**{f'{field}__icontains': term}) for field in INVENTORY_SEARCH_FIELDS))
+        )
+
+    def search(self, term):
+        return DataFilter({'search': term}, queryset=Inventory.objects.all()).qs
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['rows'])
+            for term in options['terms']:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_bitmapscan = off; SET LOCAL enable_indexscan = off;')
+                legacy_ms, legacy_count = self.time_query(lambda: list(self.legacy(term)), options['repeat'])
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_bitmapscan = on; SET LOCAL enable_indexscan = on;')
+                search_ms, search_count = self.time_query(lambda: list(self.search(term)), options['repeat'])
+                self.stdout.write(
+                    f'{term!r}: icontains seq scan {legacy_ms:.1f}ms ({legacy_count} rows), '
+                    f'trigram search {search_ms:.1f}ms ({search_count} rows)'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models import (Inventory, )
+from inventory.utils import (update_inventory_media_flags, )
+
+
+class Command(BaseCommand):
+    """
+    Recompute has_photo, has_video and primary_image_url of all inventory
+    items, migration 0149 backfills on deploy, this is for re-runs.
+    """
+    help = 'Rebuild inventory media flags.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        item_ids = list(Inventory.objects.order_by('item_id').values_list('item_id', flat=True))
+        count = 0
+        for i in range(0, len(item_ids), batch_size):
+            count += update_inventory_media_flags(Inventory.objects.filter(item_id__in=item_ids[i:i + batch_size]))
+        self.stdout.write(f'Updated media flags of {count} of {len(item_ids)} items.')
@@ -0,0 +1,33 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_FIELDS = (
+    'name',
+    'sku',
+    'cf_strain_name',
+    'category_name',
+    'cf_client_code',
+    'cf_vendor_name',
+    'vendor_name',
+)
+
+
+class Migration(migrations.Migration):
+    """
+    Trigram indexes on UPPER(field) so icontains lookups (UPPER(field) LIKE
+    UPPER(...)) on search fields can use an index instead of a sequential scan.
+    """
+
+    dependencies = [
+        ('inventory', '0146_inventory_cf_featured'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ] + [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX IF NOT EXISTS inventory_{field}_trgm ON inventory_inventory USING gin (UPPER({field}::text) gin_trgm_ops);',
+            reverse_sql=f'DROP INDEX IF EXISTS inventory_{field}_trgm;',
+        )
+        for field in SEARCH_FIELDS
+    ]
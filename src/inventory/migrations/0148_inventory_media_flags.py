@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0147_inventory_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='has_photo',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Has Photo'),
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='has_video',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Has Video'),
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='primary_image_url',
+            field=models.CharField(blank=True, max_length=500, null=True, verbose_name='Primary Image Url'),
+        ),
+    ]
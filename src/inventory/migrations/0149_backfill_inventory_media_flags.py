@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# Frozen copy of inventory.utils media flag computation as of this migration.
+PHOTO_FILE_TYPES = ('image/png', 'image/jpeg')
+VIDEO_FILE_TYPES = ('video/mp4', 'video/quicktime', 'video/x-msvideo')
+INVENTORY_MEDIA_FIELDS = ('has_photo', 'has_video', 'primary_image_url')
+
+
+def get_documents_media(Documents, skus):
+    media = dict()
+    qs = Documents.objects.filter(
+        sku__in=skus,
+        status='AVAILABLE',
+        file_type__in=PHOTO_FILE_TYPES + VIDEO_FILE_TYPES,
+    ).order_by('-is_primary', 'order', 'id').values_list('sku', 'file_type', 'S3_url', 'box_url')
+    for sku, file_type, s3_url, box_url in qs:
+        flags = media.setdefault(sku, {'has_photo': False, 'has_video': False, 'primary_image_url': None})
+        if file_type in VIDEO_FILE_TYPES:
+            flags['has_video'] = True
+        else:
+            flags['has_photo'] = True
+            flags['primary_image_url'] = flags['primary_image_url'] or s3_url or box_url
+    return media
+
+
+def get_inventory_media_flags(documents, media=None):
+    media = media or dict()
+    return {
+        'has_photo': bool(documents) or media.get('has_photo', False),
+        'has_video': media.get('has_video', False),
+        'primary_image_url': media.get('primary_image_url') or (documents[0] if documents else None),
+    }
+
+
+def forward_func(apps, schema_editor):
+    Inventory = apps.get_model('inventory', 'Inventory')
+    Documents = apps.get_model('inventory', 'Documents')
+    item_ids = list(Inventory.objects.order_by('item_id').values_list('item_id', flat=True))
+    for i in range(0, len(item_ids), 1000):
+        items = list(
+            Inventory.objects.filter(item_id__in=item_ids[i:i + 1000])
+            .only('item_id', 'sku', 'documents', *INVENTORY_MEDIA_FIELDS)
+        )
+        media = get_documents_media(Documents, {item.sku for item in items if item.sku})
+        changed = list()
+        for item in items:
+            flags = get_inventory_media_flags(item.documents, media.get(item.sku))
+            if any(getattr(item, k) != v for k, v in flags.items()):
+                for k, v in flags.items():
+                    setattr(item, k, v)
+                changed.append(item)
+        Inventory.objects.bulk_update(changed, INVENTORY_MEDIA_FIELDS)
+
+def reverse_func(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0148_inventory_media_flags'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_func, reverse_code=reverse_func),
+    ]
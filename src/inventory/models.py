@@ -189,6 +189,9 @@ class Inventory(models.Model):
     qr_code_box_id = models.CharField(_('QR Code-Box ID'), blank=True, null=True, max_length=255)
     qr_box_direct_url = models.CharField(_('QR direct Box URL'), blank=True, null=True, max_length=500)
     cf_featured = models.BooleanField(_('Featured'), default=False)
+    has_photo = models.BooleanField(_('Has Photo'), default=False, db_index=True)
+    has_video = models.BooleanField(_('Has Video'), default=False, db_index=True)
+    primary_image_url = models.CharField(_('Primary Image Url'), blank=True, null=True, max_length=500)
     extra_documents = GenericRelation(Documents)
     
 
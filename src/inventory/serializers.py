@@ -2,6 +2,7 @@
 Serializer for inventory
 """
 import json
+from collections import OrderedDict
 from decimal import Decimal
 from rest_framework import serializers
 from django.utils import timezone
@@ -10,6 +11,7 @@ from integration.apps.aws import (create_presigned_url, )
 from permission.filterqueryset import (filterQuerySet, )
 from brand.models import LicenseProfile
 from cultivar.models import Cultivar
+from labtest.models import LabTest
 from core.settings import (AWS_BUCKET, )
 from fee_variable.utils import get_item_mcsp_fee
 from .utils import get_item_tax
@@ -26,6 +28,125 @@ from .models import (
 from .data import CG
 
 
+# Nested values shown by the marketplace list, full records need ?expand=.
+INVENTORY_LIST_LABTEST_FIELDS = (
+    'id',
+    'Total_THC',
+    'Total_CBD',
+    'THC',
+    'THCA',
+    'CBD',
+    'CBDA',
+    'CBG',
+    'CBN',
+    'Total_Cannabinoids',
+    'Total_Terpenes',
+    'Moisture',
+    'Pesticides',
+    'Heavy_Metals',
+    'Mycotoxins_PASS_FAIL',
+    'Microbiological_Contamination',
+    'Sample_I_D',
+    'Date_Tested',
+    'Box_Link',
+)
+INVENTORY_LIST_CULTIVAR_FIELDS = (
+    'id',
+    'cultivar_name',
+    'cultivar_type',
+    'thc_range',
+    'cbd_range',
+    'flavor',
+    'effect',
+    'terpenes_primary',
+    'terpenes_secondary',
+    'cultivar_image',
+)
+
+
+def parse_fieldset_param(value):
+    """
+    Return set of names from comma separated query param.
+    """
+    return {x.strip() for x in (value or '').split(',') if x.strip()}
+
+
+class LabTestListSerializer(serializers.ModelSerializer):
+    """
+    Compact labtest projection for inventory list.
+    """
+    class Meta:
+        model = LabTest
+        fields = INVENTORY_LIST_LABTEST_FIELDS
+
+
+class CultivarListSerializer(serializers.ModelSerializer):
+    """
+    Compact cultivar projection for inventory list.
+    """
+    class Meta:
+        model = Cultivar
+        fields = INVENTORY_LIST_CULTIVAR_FIELDS
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Support ?fields= and ?expand= on list actions.
+    Nested labtest and cultivar use compact projections unless expanded.
+    """
+    compact_nested_fields = {
+        'labtest': (LabTestListSerializer, INVENTORY_LIST_LABTEST_FIELDS),
+        'cultivar': (CultivarListSerializer, INVENTORY_LIST_CULTIVAR_FIELDS),
+    }
+
+    @classmethod
+    def get_sparse_params(cls, request):
+        return (
+            parse_fieldset_param(request.query_params.get('fields')),
+            parse_fieldset_param(request.query_params.get('expand')),
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        view = self.context.get('view')
+        if request is None or getattr(view, 'action', None) != 'list':
+            return fields
+        requested, expand = self.get_sparse_params(request)
+        if requested:
+            fields = OrderedDict((k, v) for k, v in fields.items() if k in requested or k in expand)
+        for name, (serializer_class, _) in self.compact_nested_fields.items():
+            if name in fields and name not in expand:
+                fields[name] = serializer_class(read_only=True)
+        return fields
+
+    @classmethod
+    def get_only_fields(cls, request):
+        """
+        Return field paths for queryset.only() matching serialized fields.
+        """
+        requested, expand = cls.get_sparse_params(request)
+        model = cls.Meta.model
+        names = getattr(cls.Meta, 'fields', None)
+        if not names or names == '__all__':
+            names = [f.name for f in model._meta.concrete_fields]
+        names = [f for f in names if not requested or f in requested or f in expand]
+        concrete = {f.name for f in model._meta.concrete_fields}
+        only = [model._meta.pk.name]
+        # Views select_related these, they can not be deferred.
+        for name in cls.compact_nested_fields:
+            if name not in names:
+                only.extend((name, f'{name}__id'))
+        for name in names:
+            if name in cls.compact_nested_fields:
+                only.append(name)
+                if name not in expand:
+                    only.extend(f'{name}__{f}' for f in cls.compact_nested_fields[name][1])
+            elif name in concrete:
+                only.append(name)
+        return only
+
+
 class BaseInventorySerializer(serializers.ModelSerializer):
     """
     Base Inventory Serializer
@@ -49,7 +170,7 @@ class BaseInventorySerializer(serializers.ModelSerializer):
         depth = 1
 
 
-class InventorySerializer(BaseInventorySerializer):
+class InventorySerializer(SparseFieldsetSerializerMixin, BaseInventorySerializer):
     """
     Inventory Serializer
     """
@@ -57,7 +178,7 @@ class InventorySerializer(BaseInventorySerializer):
         exclude = ()
 
 
-class LogoutInventorySerializer(BaseInventorySerializer):
+class LogoutInventorySerializer(SparseFieldsetSerializerMixin, BaseInventorySerializer):
     """
     Logout serializer.
     """
@@ -1,9 +1,35 @@
 import datetime
 from django.dispatch import receiver
+from django.db import transaction
 from django.db.models import signals
 from django.forms.models import model_to_dict
 from django.apps import apps
 
+from .utils import (bump_inventory_version, update_inventory_media_flags, )
+
+
+def bump_inventory_version_handler(sender, **kwargs):
+    # Bump after commit so list caches rebuilt under the new version see the
+    # committed rows.
+    transaction.on_commit(bump_inventory_version)
+
+
+# Inventory list responses embed documents, labtest and cultivar.
+for model in (
+        apps.get_model('inventory', 'Inventory'),
+        apps.get_model('inventory', 'Documents'),
+        apps.get_model('labtest', 'LabTest'),
+        apps.get_model('cultivar', 'Cultivar')):
+    signals.post_save.connect(bump_inventory_version_handler, sender=model, dispatch_uid=f'bump_inventory_version_save_{model.__name__}')
+    signals.post_delete.connect(bump_inventory_version_handler, sender=model, dispatch_uid=f'bump_inventory_version_delete_{model.__name__}')
+
+
+@receiver(signals.post_save, sender=apps.get_model('inventory', 'Documents'))
+@receiver(signals.post_delete, sender=apps.get_model('inventory', 'Documents'))
+def update_inventory_media_flags_handler(sender, instance, **kwargs):
+    if instance.sku:
+        update_inventory_media_flags(apps.get_model('inventory', 'Inventory').objects.filter(sku=instance.sku))
+
 
 @receiver(signals.pre_save, sender=apps.get_model('inventory', 'CustomInventory'))
 def pre_save_custom_inventory(sender, instance, **kwargs):
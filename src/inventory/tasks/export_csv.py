@@ -2,16 +2,25 @@ import datetime
 import pytz
 import io
 import csv
+import gzip
 import json
+import tempfile
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 
 from celery.task import periodic_task
 from celery.schedules import crontab
 
-from integration.box import (upload_file_stream, )
-from integration.inventory import (get_inventory_summary,)
+from integration.box import (upload_large_file_stream, )
+from core.settings import (INVENTORY_EXPORT_CHUNK_SIZE, INVENTORY_EXPORT_SPOOL_SIZE, )
+from integration.inventory import (
+    get_inventory_summary,
+    get_grouped_inventory_summary,
+    get_county_inventory_summary,
+    build_inventory_summary,
+)
 from core.celery import app
 from django.db import transaction
 
@@ -60,62 +69,90 @@ def vendor_update_create():
     with transaction.atomic():
         batch_create_update(Vendor, ['vendor_name','cf_client_code'], ['vendor_name','cf_client_code'], vendors)
 
+SUMMARY_FIELDS = (
+    'total_thc_max',
+    'total_thc_min',
+    'batch_varities',
+    'average',
+    'total_value',
+    'smalls_quantity',
+    'tops_quantity',
+    'total_quantity',
+    'trim_quantity',
+    'average_thc',
+)
+
+PRODUCT_CATEGORIES = ['Wholesale - Terpenes','Wholesale - Flower', 'Wholesale - Isolates', 'Services', 'Wholesale - Trim', 'Lab Testing', 'Wholesale - Concentrates']
+
+
+def get_summary_fields_data(summary):
+    """
+    Return model field values of inventory summary.
+    """
+    return {field: summary.get(field) for field in SUMMARY_FIELDS}
+
+
+def get_summary_date():
+    return datetime.datetime.now(pytz.timezone('US/Pacific')).date()
+
+
 @periodic_task(run_every=(crontab(hour=[8], minute=0)), options={'queue': 'general'})
 def save_daily_aggrigated_vendor_summary():
     """
     Save daily inventory aggrigated summary(with vendor).
     """
-    vendors= Vendor.objects.filter()
-    for vendor in vendors:
-        queryset = Inventory.objects.filter(cf_cfi_published=True,status='active',cf_client_code=vendor.cf_client_code,vendor_name=vendor.vendor_name)
-        summary = get_inventory_summary(queryset, statuses=None)
-        fields_data = {
-            'total_thc_max':summary['total_thc_max'],
-            'total_thc_min':summary['total_thc_min'],
-            'batch_varities':summary['batch_varities'],
-            'average':summary['average'],
-            'total_value':summary['total_value'],
-            'smalls_quantity':summary['smalls_quantity'],
-            'tops_quantity':summary['tops_quantity'],
-            'total_quantity':summary['total_quantity'],
-            'trim_quantity':summary['trim_quantity'],
-            'average_thc':summary['average_thc']
+    date = get_summary_date()
+    queryset = Inventory.objects.filter(cf_cfi_published=True,status='active')
+    summaries = get_grouped_inventory_summary(queryset, ('cf_client_code', 'vendor_name'))
+    vendors = list(Vendor.objects.filter())
+    with transaction.atomic():
+        daily_summaries = {
+            obj.vendor_id: obj for obj in VendorDailySummary.objects.filter(vendor__in=vendors).order_by('id')
         }
-        if summary:
-            obj,created = VendorDailySummary.objects.get_or_create(vendor=vendor)
-            clean_data = json.loads(json.dumps(fields_data), object_pairs_hook=dict_clean)
-            clean_data.update({'date': datetime.datetime.now(pytz.timezone('US/Pacific')).date()})
-            obj.summary.update_or_create(**clean_data)
-            print('saving daily summary data for vendor_name `%s` and date `%s`:' % (vendor.vendor_name,clean_data['date']))
-            
+        missing = [VendorDailySummary(vendor=vendor) for vendor in vendors if vendor.id not in daily_summaries]
+        if missing:
+            VendorDailySummary.objects.bulk_create(missing)
+            daily_summaries.update({
+                obj.vendor_id: obj for obj in VendorDailySummary.objects.filter(vendor__in=vendors).order_by('id')
+                if obj.vendor_id not in daily_summaries
+            })
+        content_type = ContentType.objects.get_for_model(VendorDailySummary)
+        object_ids = [str(obj.id) for obj in daily_summaries.values()]
+        Summary.objects.filter(content_type=content_type, object_id__in=object_ids, date=date).delete()
+        objs = list()
+        for vendor in vendors:
+            summary = summaries.get((vendor.cf_client_code, vendor.vendor_name)) or build_inventory_summary(None)
+            clean_data = json.loads(json.dumps(get_summary_fields_data(summary)), object_pairs_hook=dict_clean)
+            objs.append(Summary(
+                content_type=content_type,
+                object_id=str(daily_summaries[vendor.id].id),
+                date=date,
+                **clean_data
+            ))
+        Summary.objects.bulk_create(objs)
+    print('saved daily summary data for %s vendors and date `%s`' % (len(objs), date))
+
 @app.task(queue="general")
 def save_summary_by_product_category(daily_aggrigated_summary_id):
     """
     save by parent/product cateory
     """
-    prod_category = ['Wholesale - Terpenes','Wholesale - Flower', 'Wholesale - Isolates', 'Services', 'Wholesale - Trim', 'Lab Testing', 'Wholesale - Concentrates']
-    queryset = Inventory.objects.filter(status='active',cf_cfi_published=True)
+    queryset = Inventory.objects.filter(status='active',cf_cfi_published=True,parent_category_name__in=PRODUCT_CATEGORIES)
     try:
-        for category in prod_category:
-            qs = queryset.filter(parent_category_name = category)
-            summary = get_inventory_summary(qs, statuses=None)
-            fields_data = {
-                'daily_aggrigated_summary_id':daily_aggrigated_summary_id,
-                'product_category': category,
-                'total_thc_max':summary['total_thc_max'],
-                'total_thc_min':summary['total_thc_min'],
-                'batch_varities':summary['batch_varities'],
-                'average':summary['average'],
-                'total_value':summary['total_value'],
-                'smalls_quantity':summary['smalls_quantity'],
-                'tops_quantity':summary['tops_quantity'],
-                'total_quantity':summary['total_quantity'],
-                'trim_quantity':summary['trim_quantity'],
-                'average_thc':summary['average_thc']
-            }
-            cat_obj,created =  SummaryByProductCategory.objects.update_or_create(**fields_data)
+        summaries = get_grouped_inventory_summary(queryset, 'parent_category_name')
+        objs = [
+            SummaryByProductCategory(
+                daily_aggrigated_summary_id=daily_aggrigated_summary_id,
+                product_category=category,
+                **get_summary_fields_data(summaries.get(category) or build_inventory_summary(None))
+            )
+            for category in PRODUCT_CATEGORIES
+        ]
+        with transaction.atomic():
+            SummaryByProductCategory.objects.filter(daily_aggrigated_summary_id=daily_aggrigated_summary_id).delete()
+            SummaryByProductCategory.objects.bulk_create(objs)
     except Exception as e:
-        pint('exception while saving summary by product category',e)
+        print('exception while saving summary by product category',e)
     
 @periodic_task(run_every=(crontab(hour=[8], minute=0)), options={'queue': 'general'})
 def save_daily_aggrigated_summary():
@@ -125,17 +162,8 @@ def save_daily_aggrigated_summary():
     queryset = Inventory.objects.filter(status='active',cf_cfi_published=True)
     summary = get_inventory_summary(queryset, statuses=None)
     fields_data = {
-        'date': datetime.datetime.now(pytz.timezone('US/Pacific')).date(),
-        'total_thc_max':summary['total_thc_max'],
-        'total_thc_min':summary['total_thc_min'],
-        'batch_varities':summary['batch_varities'],
-        'average':summary['average'],
-        'total_value':summary['total_value'],
-        'smalls_quantity':summary['smalls_quantity'],
-        'tops_quantity':summary['tops_quantity'],
-        'total_quantity':summary['total_quantity'],
-        'trim_quantity':summary['trim_quantity'],
-        'average_thc':summary['average_thc']
+        'date': get_summary_date(),
+        **get_summary_fields_data(summary)
     }
 
     if summary:
@@ -150,71 +178,77 @@ def save_daily_aggrigated_county_summary():
     """
     Save daily inventory aggrigated summary(with county).
     """
-    counties= County.objects.filter().values('name','id')
+    date = get_summary_date()
+    queryset = Inventory.objects.filter(cf_cfi_published=True,status='active')
+    summaries = get_county_inventory_summary(queryset)
+    objs = [
+        CountyDailySummary(
+            county_id=county['id'],
+            date=date,
+            **get_summary_fields_data(summaries.get(county['name']) or build_inventory_summary(None))
+        )
+        for county in County.objects.filter().values('name','id')
+    ]
+    with transaction.atomic():
+        CountyDailySummary.objects.filter(date=date).delete()
+        CountyDailySummary.objects.bulk_create(objs)
+    print('saved aggregated summary data for %s counties and date `%s`' % (len(objs), date))
 
-    for county in counties:
-        queryset = Inventory.objects.filter(cf_cfi_published=True,status='active',county_grown__overlap=[county['name']])
-        summary = get_inventory_summary(queryset, statuses=None)
-        fields_data = {
-            'date': datetime.datetime.now(pytz.timezone('US/Pacific')).date(),
-            'county_id': county['id'],
-            'total_thc_max':summary['total_thc_max'],
-            'total_thc_min':summary['total_thc_min'],
-            'batch_varities':summary['batch_varities'],
-            'average':summary['average'],
-            'total_value':summary['total_value'],
-            'smalls_quantity':summary['smalls_quantity'],
-            'tops_quantity':summary['tops_quantity'],
-            'total_quantity':summary['total_quantity'],
-            'trim_quantity':summary['trim_quantity'],
-            'average_thc':summary['average_thc']
-        }
 
-        if summary:
-            print('saving aggregated summary data for county `%s` and date `%s`:' % (county['name'],fields_data['date']))
-            CountyDailySummary.objects.update_or_create(**fields_data)
+def get_export_fields(model):
+    """
+    Return column names in the order of model.values().
+    """
+    return [f.attname for f in model._meta.concrete_fields]
 
 
-@periodic_task(run_every=(crontab(hour=[8], minute=0)), options={'queue': 'general'})
-def export_inventory_csv():
-    with io.StringIO() as f:
-        writer = csv.writer(f)
-        qs = Inventory.objects.all()
-        file_name = 'Inventory_'+timezone.now().strftime("%Y-%m-%d_%H:%M:%S_%Z")+'.csv'
-        if qs.count()>0:
-            fields = qs[:1].values()[0].keys()
+def write_csv_gzip(qs, fields, fileobj, chunk_size=INVENTORY_EXPORT_CHUNK_SIZE):
+    """
+    Write queryset as gzip compressed csv, rows are read with a server side
+    cursor so memory does not grow with the table. Return number of rows.
+    """
+    count = 0
+    with gzip.GzipFile(fileobj=fileobj, mode='wb') as gz:
+        with io.TextIOWrapper(gz, encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
             writer.writerow(fields)
-            writer.writerows(qs.values_list(*fields))
+            for row in qs.values_list(*fields).iterator(chunk_size=chunk_size):
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+def export_queryset_csv(qs, file_name, folder_id=None):
+    """
+    Stream queryset to a spooled gzip csv file and upload it to Box.
+    """
+    folder_id = folder_id or settings.INVENTORY_CSV_UPLOAD_FOLDER_ID
+    with tempfile.SpooledTemporaryFile(max_size=INVENTORY_EXPORT_SPOOL_SIZE) as f:
+        count = write_csv_gzip(qs, get_export_fields(qs.model), f)
+        if count:
+            size = f.tell()
             f.seek(0)
-            upload_file_stream(settings.INVENTORY_CSV_UPLOAD_FOLDER_ID, f, file_name)
+            upload_large_file_stream(folder_id, f, file_name + '.gz', size)
+        return count
+
+
+@periodic_task(run_every=(crontab(hour=[8], minute=0)), options={'queue': 'general'})
+def export_inventory_csv():
+    file_name = 'Inventory_'+timezone.now().strftime("%Y-%m-%d_%H:%M:%S_%Z")+'.csv'
+    export_queryset_csv(Inventory.objects.order_by(), file_name)
 
 
 @periodic_task(run_every=(crontab(hour=[9], minute=0)), options={'queue': 'general'})
 def export_inventory_aggrigated_csv():
-    with io.StringIO() as f:
-        writer = csv.writer(f)
-        qs = DailyInventoryAggrigatedSummary.objects.filter(date=datetime.datetime.now(pytz.timezone('US/Pacific')).date())
-        file_name = 'Aggrigated_Inventory_'+timezone.now().strftime("%Y-%m-%d_%H:%M:%S_%Z")+'.csv'
-        if qs.count()>0:
-            fields = qs[:1].values()[0].keys()
-            writer.writerow(fields)
-            writer.writerows(qs.values_list(*fields))
-            f.seek(0)
-            upload_file_stream(settings.INVENTORY_CSV_UPLOAD_FOLDER_ID, f, file_name)
+    qs = DailyInventoryAggrigatedSummary.objects.filter(date=datetime.datetime.now(pytz.timezone('US/Pacific')).date())
+    file_name = 'Aggrigated_Inventory_'+timezone.now().strftime("%Y-%m-%d_%H:%M:%S_%Z")+'.csv'
+    export_queryset_csv(qs, file_name)
 
 
 @periodic_task(run_every=(crontab(hour=[9], minute=0)), options={'queue': 'general'})
 def export_inventory_aggrigated_county_csv():
     counties= County.objects.filter().values('name','id')
     for county in counties:
-        with io.StringIO() as f:
-            writer = csv.writer(f)
-            qs = CountyDailySummary.objects.filter(date=datetime.datetime.now(pytz.timezone('US/Pacific')).date(),county_id=county['id'])
-            file_name = county['name']+'_Aggrigated_Inventory_'+timezone.now().strftime("%Y-%m-%d_%H:%M:%S_%Z")+'.csv'
-            if qs.count()>0:
-                fields = qs[:1].values()[0].keys()
-                writer.writerow(fields)
-                writer.writerows(qs.values_list(*fields))
-                f.seek(0)
-                upload_file_stream(settings.INVENTORY_CSV_UPLOAD_FOLDER_ID, f, file_name)
-
+        qs = CountyDailySummary.objects.filter(date=datetime.datetime.now(pytz.timezone('US/Pacific')).date(),county_id=county['id'])
+        file_name = county['name']+'_Aggrigated_Inventory_'+timezone.now().strftime("%Y-%m-%d_%H:%M:%S_%Z")+'.csv'
+        export_queryset_csv(qs, file_name)
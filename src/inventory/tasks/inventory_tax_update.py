@@ -10,10 +10,9 @@ from integration.inventory import (
     update_inventory_item
 )
 from fee_variable.utils import (
-    get_item_mcsp_fee,
+    get_items_mcsp_fee,
 )
 
-from brand.models import (LicenseProfile,)
 from ..data import (
     ITEM_CUSTOM_FIELD_ORG_MAP,
 )
@@ -47,19 +46,16 @@ def update_zoho_item_tax(item_ids=[], org='efd'):
 
     print(f'Item count: {qs.count()}')
     
-    for item in qs.all():
+    items = list(qs.all())
+    mcsp_fees = get_items_mcsp_fee(
+        {
+            'vendor_name': item.cf_vendor_name,
+            'item_category': item.category_name,
+            'farm_price': item.cf_farm_price_2,
+        } for item in items
+    )
+    for item, mcsp_fee in zip(items, mcsp_fees):
         print(f'\nUpdating Tax for item {item.pk}: {item.name}')
-        lp=None
-        lp_qs = LicenseProfile.objects.filter(
-            **{f'license__zoho_books_vendor_ids__{item.inventory_name.lower()}': item.vendor_id}
-        )
-        if lp_qs.exists():
-            lp = lp_qs.first()
-        mcsp_fee = get_item_mcsp_fee(
-            item.cf_vendor_name,
-            item_category=item.category_name,
-            farm_price=item.cf_farm_price_2,
-        )
         if isinstance(mcsp_fee, Decimal):
             cultivation_tax = get_item_tax(
                 category_name=item.category_name,
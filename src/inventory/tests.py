@@ -1,3 +1,150 @@
+from django.db.models import (Sum, F, Min, Max, Avg, Q, )
 from django.test import TestCase
+from django.utils import timezone
 
-# Create your tests here.
+from integration.inventory import (get_inventory_summary, )
+from labtest.models import (LabTest, PESTICIDE_SUMMARY_FIELDS, )
+from .models import (Inventory, )
+from .views import (DataFilter, )
+
+
+def legacy_inventory_summary(inventory, statuses):
+    """
+    Previous per metric implementation of get_inventory_summary.
+    """
+    response = dict()
+    categories = ['Processing',
+                  'Vegging,Flowering,Under Contract', 'Sold']
+    labtest = LabTest.objects.filter(id__in=inventory.values('labtest_id'))
+    response['total_thc_min'] = labtest.aggregate(Min('Total_THC'))['Total_THC__min']
+    response['total_thc_max'] = labtest.aggregate(Max('Total_THC'))['Total_THC__max']
+    try:
+        item_qs = inventory.filter(cf_cfi_published=True,status='active',actual_available_stock__gt=0,labtest__Total_THC__gt=0)
+        summation = item_qs.aggregate(total=Sum(F('actual_available_stock') * F('labtest__Total_THC')))['total']
+        quantity_sum = item_qs.aggregate(Sum('actual_available_stock'))['actual_available_stock__sum']
+        response['average_thc'] = summation/quantity_sum
+    except Exception:
+        response['average_thc'] = 0
+    field = 'cf_quantity_estimate' if statuses in categories else 'actual_available_stock'
+    response['total_quantity'] = inventory.filter(inventory_name__in=['EFD','EFL','EFN']).aggregate(total=Sum(field))['total']
+    for category in ['Tops', 'Smalls', 'Trim']:
+        response[category.lower() + '_quantity'] = inventory.filter(
+            cf_cannabis_grade_and_category__contains=category).aggregate(total=Sum(field))['total']
+    response['total_value'] = inventory.aggregate(total=Sum(F(field)*F('pre_tax_price')))['total']
+    response['average'] = inventory.aggregate(Avg('pre_tax_price'))['pre_tax_price__avg']
+    response['batch_varities'] = inventory.order_by().distinct('sku').count()
+    return response
+
+
+class InventorySummaryTestCase(TestCase):
+    """
+    get_inventory_summary must match the per metric implementation.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        labtest_1 = LabTest.objects.create(Total_THC=21.5)
+        labtest_2 = LabTest.objects.create(Total_THC=18.25)
+        labtest_3 = LabTest.objects.create(Total_THC=None)
+        items = (
+            ('1', 'SKU-1', 'EFD', 'Tops - A', 'active', True, 100, 120, 500.0, labtest_1, 'Available'),
+            ('2', 'SKU-1', 'EFL', 'Smalls - B', 'active', True, 50, None, 350.0, labtest_2, 'Available'),
+            ('3', 'SKU-2', 'EFN', 'Trim', 'inactive', False, 0, 40, 90.0, labtest_3, 'Processing'),
+            ('4', None, 'EFD', 'Tops - B', 'active', True, 25, 30, None, None, 'Sold'),
+            ('5', None, None, None, 'active', None, None, None, 410.0, labtest_1, 'Vegging'),
+        )
+        now = timezone.now()
+        for item_id, sku, inventory_name, grade, status, published, stock, estimate, price, labtest, cf_status in items:
+            Inventory.objects.create(
+                item_id=item_id,
+                sku=sku,
+                name=f'Item {item_id}',
+                category_name='Flower - Tops',
+                created_time=now,
+                last_modified_time=now,
+                price=price or 0,
+                purchase_rate=0,
+                tax_percentage=0,
+                inventory_name=inventory_name,
+                cf_cannabis_grade_and_category=grade,
+                status=status,
+                cf_cfi_published=published,
+                actual_available_stock=stock,
+                cf_quantity_estimate=estimate,
+                pre_tax_price=price,
+                labtest=labtest,
+                cf_status=cf_status,
+            )
+
+    def assertSummaryEqual(self, qs, statuses):
+        summary = get_inventory_summary(qs, statuses)
+        expected = legacy_inventory_summary(qs, statuses)
+        self.assertEqual(list(summary.keys()), list(expected.keys()))
+        for key, value in expected.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(summary[key], value, msg=key)
+            else:
+                self.assertEqual(summary[key], value, msg=key)
+
+    def test_summary_matches_legacy(self):
+        qs = Inventory.objects.all()
+        for statuses in (None, 'Available', 'Processing', 'Vegging,Flowering,Under Contract', 'Sold'):
+            self.assertSummaryEqual(qs, statuses)
+
+    def test_summary_matches_legacy_on_filtered_qs(self):
+        self.assertSummaryEqual(Inventory.objects.filter(cf_status='Available'), 'Available')
+        self.assertSummaryEqual(Inventory.objects.filter(cf_status='Processing'), 'Processing')
+
+    def test_summary_on_empty_qs(self):
+        self.assertSummaryEqual(Inventory.objects.none(), None)
+
+
+class PesticideSummaryFilterTestCase(TestCase):
+    """
+    cf_pesticide_summary__in must match the per analyte Q filter.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        all_nd = {field: 'ND' for field in PESTICIDE_SUMMARY_FIELDS}
+        labtests = (
+            LabTest.objects.create(Pesticides='PASS', **all_nd),
+            LabTest.objects.create(Pesticides='PASS', **{**all_nd, 'Acephate': '<LOQ'}),
+            LabTest.objects.create(Pesticides='FAIL', **{**all_nd, 'Naled': '0.6'}),
+            LabTest.objects.create(**{**all_nd, 'Captan': None}),
+            LabTest.objects.create(),
+        )
+        now = timezone.now()
+        for i, labtest in enumerate(labtests + (None,)):
+            Inventory.objects.create(
+                item_id=str(i),
+                name=f'Item {i}',
+                created_time=now,
+                last_modified_time=now,
+                price=0,
+                purchase_rate=0,
+                tax_percentage=0,
+                labtest=labtest,
+            )
+
+    def legacy_filter(self, values):
+        values = ['ND' if val == 'Non-Detect' else val for val in values]
+        q = Q(**{'labtest__'+x+'__in': values for x in PESTICIDE_SUMMARY_FIELDS}, _connector='AND')
+        return Inventory.objects.filter(q).distinct()
+
+    def test_summary_fields(self):
+        labtest = LabTest.objects.get(Pesticides='FAIL')
+        self.assertEqual(labtest.pesticide_values, ['0.6', 'ND'])
+        self.assertEqual(labtest.pesticides_detected, ['Naled'])
+        self.assertEqual(labtest.pesticide_summary, 'FAIL')
+        self.assertEqual(LabTest.objects.filter(pesticide_summary='ND').count(), 1)
+        self.assertEqual(LabTest.objects.filter(pesticide_values__isnull=True).count(), 2)
+
+    def test_filter_matches_legacy(self):
+        for values in ('Non-Detect', 'ND', 'ND,<LOQ', 'ND,<LOQ,0.6', '0.6', 'PASS'):
+            qs = DataFilter({'cf_pesticide_summary__in': values}, queryset=Inventory.objects.all()).qs
+            self.assertEqual(
+                sorted(qs.values_list('item_id', flat=True)),
+                sorted(self.legacy_filter(values.split(',')).values_list('item_id', flat=True)),
+                msg=values,
+            )
@@ -1,9 +1,18 @@
 import decimal
+import json
 from decimal import Decimal
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import (CharField, Count, F, Func, )
+from django.utils import timezone
+from rest_framework.utils.encoders import (JSONEncoder, )
 
+from core.cache import (get_redis_connection, )
+from core.settings import (INVENTORY_LIST_CACHE_TTL, INVENTORY_FACET_CACHE_TTL, AWS_BUCKET, )
+from integration.apps.aws import (create_presigned_urls, )
 from fee_variable.models import (TaxVariable, )
-from .models import InTransitOrder
+from fee_variable.utils import (get_cached_tax_variable, )
+from .models import (Inventory, InTransitOrder, Documents, )
 from .data import (CG, )
 
 
@@ -16,7 +25,7 @@ BIOMASS_TYPE_TO_TAX = {
 def get_tax_from_db(tax='dried_flower_tax', request=None):
     msg_error = lambda msg: messages.error(request, msg,) if request else None
     try:
-        tax_var = TaxVariable.objects.latest('-created_on')
+        tax_var = get_cached_tax_variable()
     except TaxVariable.DoesNotExist:
         msg_error('Tax variables not found in db.')
         return None
@@ -80,3 +89,200 @@ def delete_in_transit_item(estimate_id):
     if transit_orders:
         transit_orders.delete()
 
+
+
+INVENTORY_VERSION_KEY = 'inventory:version'
+INVENTORY_LIST_CACHE_PREFIX = 'inventory:list_cache'
+
+
+def get_inventory_version():
+    """
+    Return global inventory version, bumped on every inventory write.
+    """
+    try:
+        return int(get_redis_connection().get(INVENTORY_VERSION_KEY) or 0)
+    except Exception as exc:
+        print(exc)
+        return None
+
+
+def bump_inventory_version():
+    """
+    Invalidate inventory caches keyed on inventory version.
+    """
+    try:
+        return get_redis_connection().incr(INVENTORY_VERSION_KEY)
+    except Exception as exc:
+        print(exc)
+        return None
+
+
+def get_inventory_list_cache(key):
+    """
+    Return cached inventory list response data and record hit/miss.
+    """
+    try:
+        db = get_redis_connection()
+        data = db.get(f'{INVENTORY_LIST_CACHE_PREFIX}:{key}')
+        db.incr(f'{INVENTORY_LIST_CACHE_PREFIX}:{"hits" if data else "misses"}')
+    except Exception as exc:
+        print(exc)
+        return None
+    if data:
+        return json.loads(data)
+    return None
+
+
+def set_inventory_list_cache(key, data, ttl=INVENTORY_LIST_CACHE_TTL):
+    """
+    Cache inventory list response data.
+    """
+    try:
+        get_redis_connection().setex(f'{INVENTORY_LIST_CACHE_PREFIX}:{key}', ttl, json.dumps(data, cls=JSONEncoder))
+    except Exception as exc:
+        print(exc)
+
+
+def get_inventory_list_cache_stats():
+    """
+    Return inventory list cache hit/miss counts.
+    """
+    db = get_redis_connection()
+    hits, misses = db.mget(f'{INVENTORY_LIST_CACHE_PREFIX}:hits', f'{INVENTORY_LIST_CACHE_PREFIX}:misses')
+    return {
+        'version': get_inventory_version(),
+        'hits': int(hits or 0),
+        'misses': int(misses or 0),
+    }
+
+
+def get_latest_documents(object_ids, doc_types):
+    """
+    Return {(object_id, doc_type): document} of latest documents in one query.
+    """
+    object_ids = {str(i) for i in object_ids if i is not None}
+    if not object_ids:
+        return dict()
+    qs = Documents.objects.filter(
+        object_id__in=object_ids,
+        doc_type__in=doc_types,
+    ).order_by('object_id', 'doc_type', '-created_on').distinct('object_id', 'doc_type')
+    return {(doc.object_id, doc.doc_type): doc for doc in qs}
+
+
+def get_documents_urls(documents):
+    """
+    Return {document pk: url}, box url if available else presigned s3 url.
+    """
+    documents = [doc for doc in documents if doc is not None]
+    presigned = create_presigned_urls(
+        AWS_BUCKET, [doc.path for doc in documents if not doc.box_url and doc.path])
+    return {
+        doc.pk: doc.box_url or presigned.get(doc.path)
+        for doc in documents
+    }
+
+
+INVENTORY_FACET_FIELDS = ('county_grown', 'appellation', 'nutrients', 'ethics_and_certification')
+INVENTORY_FACET_CACHE_KEY = 'inventory:facets'
+
+
+def get_facet_counts(queryset, field):
+    """
+    Return [{'value': ..., 'count': ...}] of array field values over queryset,
+    counted in sql with unnest(...) GROUP BY.
+    """
+    rows = queryset.order_by().annotate(
+        facet_value=Func(F(field), function='unnest', output_field=CharField()),
+    ).values('facet_value').annotate(count=Count('pk', distinct=True)).values_list('facet_value', 'count')
+    return sorted(
+        ({'value': value, 'count': count} for value, count in rows if value),
+        key=lambda x: (-x['count'], x['value']),
+    )
+
+
+def rebuild_inventory_facets(fields=INVENTORY_FACET_FIELDS):
+    """
+    Compute facet counts of published inventory and cache them in redis.
+    """
+    queryset = Inventory.objects.filter(cf_cfi_published=True)
+    data = {
+        'refreshed_at': timezone.now().isoformat(),
+        'facets': {field: get_facet_counts(queryset, field) for field in fields},
+    }
+    try:
+        get_redis_connection().setex(INVENTORY_FACET_CACHE_KEY, INVENTORY_FACET_CACHE_TTL, json.dumps(data))
+    except Exception as exc:
+        print(exc)
+    return data
+
+
+def get_inventory_facets():
+    """
+    Return cached facet table of published inventory, rebuilt when missing.
+    """
+    try:
+        cached = get_redis_connection().get(INVENTORY_FACET_CACHE_KEY)
+        if cached:
+            return json.loads(cached)
+    except Exception as exc:
+        print(exc)
+    return rebuild_inventory_facets()
+
+
+PHOTO_FILE_TYPES = ('image/png', 'image/jpeg')
+VIDEO_FILE_TYPES = ('video/mp4', 'video/quicktime', 'video/x-msvideo')
+INVENTORY_MEDIA_FIELDS = ('has_photo', 'has_video', 'primary_image_url')
+
+
+def get_documents_media(skus, documents=None):
+    """
+    Return {sku: media flags} of available photo/video documents.
+    """
+    media = dict()
+    documents = Documents.objects.all() if documents is None else documents
+    qs = documents.filter(
+        sku__in=skus,
+        status=Documents.AVAILABLE,
+        file_type__in=PHOTO_FILE_TYPES + VIDEO_FILE_TYPES,
+    ).order_by('-is_primary', 'order', 'id').values_list('sku', 'file_type', 'S3_url', 'box_url')
+    for sku, file_type, s3_url, box_url in qs:
+        flags = media.setdefault(sku, {'has_photo': False, 'has_video': False, 'primary_image_url': None})
+        if file_type in VIDEO_FILE_TYPES:
+            flags['has_video'] = True
+        else:
+            flags['has_photo'] = True
+            flags['primary_image_url'] = flags['primary_image_url'] or s3_url or box_url
+    return media
+
+
+def get_inventory_media_flags(documents, media=None):
+    """
+    Return media flags of an item from its Zoho documents and documents media.
+    """
+    media = media or dict()
+    return {
+        'has_photo': bool(documents) or media.get('has_photo', False),
+        'has_video': media.get('has_video', False),
+        'primary_image_url': media.get('primary_image_url') or (documents[0] if documents else None),
+    }
+
+
+def update_inventory_media_flags(items, documents=None):
+    """
+    Recompute media flags of inventory queryset, return number of updated items.
+    """
+    model = items.model
+    items = list(items.only('item_id', 'sku', 'documents', *INVENTORY_MEDIA_FIELDS))
+    media = get_documents_media({item.sku for item in items if item.sku}, documents)
+    changed = list()
+    for item in items:
+        flags = get_inventory_media_flags(item.documents, media.get(item.sku))
+        if any(getattr(item, k) != v for k, v in flags.items()):
+            for k, v in flags.items():
+                setattr(item, k, v)
+            changed.append(item)
+    if changed:
+        model.objects.bulk_update(changed, INVENTORY_MEDIA_FIELDS)
+        transaction.on_commit(bump_inventory_version)
+    return len(changed)
@@ -6,6 +6,8 @@ import time
 import re
 import copy
 import json
+import hashlib
+import csv
 from urllib.parse import (unquote, )
 from datetime import datetime, timedelta
 from io import BytesIO, BufferedReader
@@ -16,10 +18,14 @@ from django.shortcuts import (render, )
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import (Sum, F, Min, Max, Avg, Q, Func, ExpressionWrapper, DateField, Case, Value, When,)
 from django.db.models import Prefetch, IntegerField
+from django.db.models.functions import (Greatest, )
+from django.contrib.postgres.search import (TrigramSimilarity, )
 from django.utils import  timezone
+from django.http import (StreamingHttpResponse, )
 from rest_framework.views import APIView
 from rest_framework.viewsets import (GenericViewSet, mixins)
 from rest_framework.response import (Response, )
+from rest_framework.decorators import (action, )
 from rest_framework.authentication import (TokenAuthentication, )
 from rest_framework import (viewsets, status,)
 from rest_framework.filters import (OrderingFilter, )
@@ -40,6 +46,7 @@ from .serializers import (
     InventoryItemEditSerializer,
     InventoryItemQuantityAdditionSerializer,
     InventoryItemDelistSerializer,
+    parse_fieldset_param,
 )
 from .models import (
     Inventory,
@@ -51,7 +58,7 @@ from .models import (
     InventoryItemQuantityAddition,
     InventoryItemDelist,
 )
-from core.settings import (AWS_BUCKET,)
+from core.settings import (AWS_BUCKET, INVENTORY_EXPORT_CHUNK_SIZE, )
 from integration.apps.aws import (create_presigned_url, create_presigned_post,)
 from .permissions import (DocumentPermission, InventoryPermission, )
 from integration.box import (delete_file, get_file_obj,)
@@ -64,6 +71,7 @@ from integration.inventory import (
     get_inventory_name, update_inventory_item, get_contacts,
     get_inventory_summary, get_category_count,
     get_packages, get_sales_returns, get_inventory_metadata,
+    get_cached_inventory_field_values,
     update_package, update_sales_return, update_contact, create_package,
     get_books_name_from_inventory_name, get_books_name_from_inventory_name)
 from .tasks import (
@@ -78,11 +86,32 @@ from .tasks import (
     inventory_sync_task,
 )
 from integration.books import (get_salesorder, parse_book_object)
-from .utils import delete_in_transit_item
+from .utils import (delete_in_transit_item, get_inventory_version, get_inventory_list_cache, set_inventory_list_cache,
+                    get_facet_counts, get_inventory_facets, )
 from bill.tasks import remove_estimates_after_intransit_clears
 from bill.models import (Estimate, LineItem, )
 from bill.utils import (parse_fields, get_notify_addresses, save_estimate, save_estimate_from_intransit, parse_intransit_to_pending,)
 
+class Echo:
+    """
+    Pseudo buffer for csv.writer, write returns the row.
+    """
+
+    def write(self, value):
+        return value
+
+
+INVENTORY_SEARCH_FIELDS = (
+    'name',
+    'sku',
+    'cf_strain_name',
+    'category_name',
+    'cf_client_code',
+    'cf_vendor_name',
+    'vendor_name',
+)
+
+
 class CharInFilter(BaseInFilter,CharFilter):
     pass
 
@@ -105,6 +134,7 @@ class DataFilter(FilterSet):
     cultivar = django_filters.CharFilter(method='get_cultivars')
     tags = django_filters.CharFilter(method='get_tags')
     tags__no_tags = django_filters.CharFilter(method='tags_no_tags')
+    search = django_filters.CharFilter(method='get_search')
     nutrients = django_filters.CharFilter(method='get_nutrients')
     ethics_and_certification = django_filters.CharFilter(method='get_ethics_and_certification')
     county_grown = django_filters.CharFilter(method='get_county_grown')
@@ -143,6 +173,23 @@ class DataFilter(FilterSet):
                 F('cf_date_available') + timedelta(days=7),output_field=DateField())).filter(full_date__gt=timezone.now().date())
         return items
     
+    def get_search(self, queryset, name, value):
+        """
+        Free text search over INVENTORY_SEARCH_FIELDS using the trigram
+        indexes, ordered by relevance unless an explicit ordering is requested.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
+        queryset = queryset.filter(
+            reduce(operator.or_, (Q(**{f'{field}__icontains': value}) for field in INVENTORY_SEARCH_FIELDS))
+        ).annotate(
+            search_rank=Greatest(*(TrigramSimilarity(field, value) for field in INVENTORY_SEARCH_FIELDS)),
+        )
+        if self.request and self.request.query_params.get('ordering'):
+            return queryset.order_by(*queryset.query.order_by, '-search_rank')
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
+
     def get_cultivars(self, queryset, name, value):
         items = queryset.filter(
             cf_strain_name__icontains=value).filter(cf_cfi_published=True)
@@ -173,33 +220,14 @@ class DataFilter(FilterSet):
         return items
     
     def get_photo_video_items(self, queryset, name, value):
-        check_for = value.split(',')
-        media_map = {**dict.fromkeys(['photo','no_photo'],['image/png','image/jpeg']),**dict.fromkeys(['video','no_video'],['video/mp4','video/quicktime','video/x-msvideo'])}
-        document_objs =  Documents.objects.filter(status='AVAILABLE').select_related()
-        null_doc_skus = Inventory.objects.filter(extra_documents__isnull=True).values_list('sku',flat=True).distinct()
-        if len(check_for) == 2 and set(['photo','video']).issubset(check_for):
-             qs1 = document_objs.filter(Q(file_type__contains=media_map.get('photo')[0])|Q(file_type__contains=media_map.get('photo')[1])).values_list('sku',flat=True)
-             qs2 =  document_objs.filter(Q(file_type__contains=media_map.get('video')[0])|Q(file_type__contains=media_map.get('video')[1])|Q(file_type__contains=media_map.get('video')[2])).values_list('sku',flat=True)
-             skus = list(set(list(qs1)).intersection(list(qs2)))
-        elif len(check_for) == 1 and any(x in ['photo','video'] for x in check_for):
-            skus = document_objs.filter(file_type__in=media_map.get(check_for[0])).values_list('sku',flat=True).distinct()
-        elif len(check_for) == 2 and set(['no_photo','no_video']).issubset(check_for):
-            exclude_skus = document_objs.exclude(file_type__in=media_map.get('photo')+media_map.get('video')).values_list('sku',flat=True).distinct()
-            null_doc_skus = null_doc_skus.filter(documents__len=0)
-            skus = list(set(list(null_doc_skus)+list(exclude_skus)))
-        elif len(check_for) == 1 and any(x in ['no_photo','no_video'] for x in check_for):
-            if check_for[0] == 'no_photo':
-                null_doc_skus = null_doc_skus.filter(documents__isnull=True).values_list('sku',flat=True)
-                exclude_skus = Inventory.objects.filter(cf_cfi_published=True,status='active').exclude(extra_documents__file_type__in=media_map.get(check_for[0])).filter(documents__len=0).values_list('sku',flat=True)
-            else:
-                exclude_skus = Inventory.objects.filter(cf_cfi_published=True,status='active').exclude(extra_documents__file_type__in=media_map.get(check_for[0])).values_list('sku',flat=True)
-            skus = list(set(list(null_doc_skus)+list(exclude_skus)))
-        elif len(check_for) == 2 and any(x in ['no_photo','no_video'] for x in check_for):
-            skus = document_objs.exclude(file_type__in=media_map.get('photo')+media_map.get('video')).values_list('sku',flat=True).distinct()
-        else:
-            skus = document_objs.exclude(file_type__in=media_map.get('photo')+media_map.get('video')).values_list('sku',flat=True).distinct()
-        items = queryset.filter(cf_cfi_published=True,status='active',sku__in=skus)
-        return items
+        media_filters = {
+            'photo': Q(has_photo=True),
+            'no_photo': Q(has_photo=False),
+            'video': Q(has_video=True),
+            'no_video': Q(has_video=False),
+        }
+        q = [media_filters[x] for x in value.split(',') if x in media_filters]
+        return queryset.filter(*q, cf_cfi_published=True, status='active')
     
     def cf_strain_name__in(self, queryset, name, values):
         #items = queryset.filter(cf_cfi_published=True,cf_strain_name__in=values)
@@ -235,22 +263,7 @@ class DataFilter(FilterSet):
     def filter_cf_pesticide_summary__in(self, queryset, name, values):
         values = ['ND' if val == 'Non-Detect' else val for val in values ]
         queryset.select_related('labtest')
-        pesticide_summary_fields = (
-            'Acephate', 'Acequinocyl', 'Acetamiprid', 'Aldicarb', 'Azoxystrobin', 'Bifenazate',
-            'Bifenthrin', 'Boscalid', 'Captan', 'Carbaryl', 'Carbofuran', 'Chlordane',
-            'Chlorfenapyr', 'Chlorpyrifos', 'Chlortraniliprole', 'Clofentazine', 'Coumaphos',
-            'Cyfluthrin', 'Cypermethrin', 'Daminozide', 'Diazinon', 'Dichlorvos', 'Dimethoate',
-            'Dimethomorph', 'Ethoprop', 'Etofenprox', 'Etoxazole', 'Fenhexamid', 'Fenoxycarb',
-            'Fenpyroximate', 'Fipronil', 'Flonicamid', 'Fludoxinil', 'Hexythiazox', 'Imazilil',
-            'Imidacloprid', 'Kresoxim_methyl', 'Malathion', 'Metalaxyl', 'Methiocarb', 'Methomyl',
-            'Mevinphos', 'Myclobutanil', 'Naled', 'Oxamyl', 'Paclobutrazole', 'Parathion_methyl',
-            'Pentachloronitrobenzene', 'Permethrin', 'Phosmet', 'Piperonyl_butoxide', 'Prallethrin',
-            'Propiconazole', 'Propoxur', 'Pyrethrins', 'Pyridaben', 'Spinatoram', 'Spinosad',
-            'Spiromesifen', 'Spirotetramat', 'Spiroxamine', 'Tebuconazole', 'Thiacloprid',
-            'Thiamethoxam', 'Trifloxystrobin',
-        )
-        q = Q(**{'labtest__'+x+'__in': values for x in pesticide_summary_fields}, _connector='AND')
-        return queryset.filter(q).distinct()
+        return queryset.filter(labtest__pesticide_values__contained_by=values)
 
     def get_cf_cannabis_grade_and_category(self, queryset, name, values):
         Tops = ["Tops A","Tops AA","Tops AAA","Tops B","Tops C"]
@@ -411,13 +424,32 @@ class InventoryViewSet(viewsets.ModelViewSet):
         qs = self.prefetch_related_docs(qs)
         if self.action == 'list':
             if not self.request.query_params.get('cf_vendor_name'):
-                return self.extract_positive_value_queryset(qs)
+                qs = self.extract_positive_value_queryset(qs)
+            return qs.only(*self.get_serializer_class().get_only_fields(self.request))
         return qs
 
+    def get_list_cache_key(self, request):
+        """
+        Return response cache key for current inventory version, serializer
+        and normalized query params. None if version is unavailable.
+        """
+        version = get_inventory_version()
+        if version is None:
+            return None
+        params = sorted((k, sorted(v)) for k, v in request.query_params.lists())
+        params_hash = hashlib.sha1(json.dumps(params).encode('utf-8')).hexdigest()
+        return f'{version}:{self.get_serializer_class().__name__}:{params_hash}'
+
     def list(self, request):
         """
         Return inventory list queryset with summary.
+        Responses are cached until inventory version changes.
         """
+        cache_key = self.get_list_cache_key(request)
+        if cache_key:
+            data = get_inventory_list_cache(cache_key)
+            if data is not None:
+                return Response(data)
         page_size = request.query_params.get('page_size', 50)
         request.query_params._mutable = True
         statuses = None
@@ -453,6 +485,8 @@ class InventoryViewSet(viewsets.ModelViewSet):
         data['summary'] = summary
         data['categories_count'] = category_count
         data['results'] = serializer.data
+        if cache_key:
+            set_inventory_list_cache(cache_key, data)
         return Response(data)
 
     # def put(self, request):
@@ -995,53 +1029,54 @@ class InventoryDeleteView(APIView):
                 pass
         return Response({}, status=status.HTTP_400_BAD_REQUEST)
 
-class InventoryCountyView(APIView):
+class InventoryFacetView(APIView):
     """
-    Return Inventory county.
+    Return values of an inventory array field with item counts.
+    Unfiltered requests are served from the cached facet table, DataFilter
+    params narrow the counts to the filtered inventory.
     """
     permission_classes = (AllowAny, )
+    facet_field = None
 
     def get(self, request):
-        """
-        Get inventory county.
-        """
-        categories = Inventory.objects.filter(cf_cfi_published=True).values_list('county_grown',flat=True).distinct()
-        clean_counties = list(filter(None,list(categories)))
+        filter_params = {k: v for k, v in request.query_params.items() if k in DataFilter.base_filters}
+        if filter_params:
+            qs = DataFilter(filter_params, queryset=Inventory.objects.filter(cf_cfi_published=True)).qs
+            counts = get_facet_counts(qs, self.facet_field)
+            refreshed_at = timezone.now().isoformat()
+        else:
+            facets = get_inventory_facets()
+            counts = facets['facets'].get(self.facet_field)
+            if counts is None:
+                counts = get_facet_counts(Inventory.objects.filter(cf_cfi_published=True), self.facet_field)
+            refreshed_at = facets['refreshed_at']
         return Response({
             'status_code': 200,
-            'response': list(set([item for sublist in clean_counties for item in sublist]))})
+            'response': [x['value'] for x in counts],
+            'counts': counts,
+            'refreshed_at': refreshed_at,
+        })
+
 
-class InventoryAppellationView(APIView):
+class InventoryCountyView(InventoryFacetView):
+    """
+    Return Inventory county.
+    """
+    facet_field = 'county_grown'
+
+
+class InventoryAppellationView(InventoryFacetView):
     """
     Return Inventory Appellation.
     """
-    permission_classes = (AllowAny, )
+    facet_field = 'appellation'
 
-    def get(self, request):
-        """
-        Get inventory appellation
-        """
-        categories = Inventory.objects.filter(cf_cfi_published=True).values_list('appellation',flat=True).distinct()
-        clean_appellation = list(filter(None,list(categories)))
-        return Response({
-            'status_code': 200,
-            'response': list(set([item for sublist in clean_appellation for item in sublist]))})
-    
-class InventoryNutrientsView(APIView):
+
+class InventoryNutrientsView(InventoryFacetView):
     """
     Return Inventory nutrients.
     """
-    permission_classes = (AllowAny, )
-
-    def get(self, request):
-        """
-        Get inventory nutrients.
-        """
-        nutrients = Inventory.objects.filter(cf_cfi_published=True).values_list('nutrients',flat=True).distinct()
-        clean_nutrients = list(filter(None,list(nutrients)))
-        return Response({
-            'status_code': 200,
-            'response':list(set([item for sublist in clean_nutrients for item in sublist]))})
+    facet_field = 'nutrients'
 
 class InventoryTagsView(APIView):
     """
@@ -1053,11 +1088,12 @@ class InventoryTagsView(APIView):
         """
         Get inventory tags
         """
-        response = get_inventory_metadata('inventory_efd')
-        dynamic_tags = list(filter(lambda tags: tags['label'] == 'Tags', response['custom_fields']))
+        data = get_cached_inventory_field_values('inventory_efd', 'Tags')
         return Response({
             'status_code': 200,
-            'response': [val['name'] for val in dynamic_tags[0]['values']]})
+            'response': data['values'],
+            'refreshed_at': data['refreshed_at'],
+        })
 
 
 class InventoryStatusChoicesView(APIView):
@@ -1070,14 +1106,11 @@ class InventoryStatusChoicesView(APIView):
         """
         Get inventory Status Choices
         """
-        response = get_inventory_metadata('inventory_efd')
+        data = get_cached_inventory_field_values('inventory_efd', 'Marketplace Status')
         return Response({
             'status_code': 200,
-            'response': [
-                val['name'] 
-                for f in response['custom_fields'] if f['label'] == 'Marketplace Status'
-                for val in f['values']
-            ]
+            'response': data['values'],
+            'refreshed_at': data['refreshed_at'],
         })
 
 class InventoryGradeChoicesView(APIView):
@@ -1090,32 +1123,19 @@ class InventoryGradeChoicesView(APIView):
         """
         Get inventory grade Choices
         """
-        response = get_inventory_metadata('inventory_efd')
+        data = get_cached_inventory_field_values('inventory_efd', 'Grade')
         return Response({
             'status_code': 200,
-            'response': [
-                val['name'] 
-                for f in response['custom_fields'] if f['label'] == 'Grade'
-                for val in f['values']
-            ]
+            'response': data['values'],
+            'refreshed_at': data['refreshed_at'],
         })
 
 
-class InventoryEthicsView(APIView):
+class InventoryEthicsView(InventoryFacetView):
     """
     Return Inventory ethics & certifications
     """
-    permission_classes = (AllowAny, )
-
-    def get(self, request):
-        """
-        Get inventory ethics & certifications
-        """
-        ethics = Inventory.objects.filter(cf_cfi_published=True).values_list('ethics_and_certification',flat=True).distinct()
-        clean_ethics = list(filter(None,list(ethics)))
-        return Response({
-            'status_code': 200,
-            'response': list(set([item for sublist in clean_ethics for item in sublist]))})
+    facet_field = 'ethics_and_certification'
 
 
 class CustomInventoryFilterSet(FilterSet):
@@ -1197,10 +1217,11 @@ class InventoryExportViewSet(viewsets.ModelViewSet):
         """
         qs = Inventory.objects.filter(status='active',cf_cfi_published=True)
         qs = qs.select_related('cultivar', 'labtest')
-        if self.request.query_params.get('cf_vendor_name'):
-            return qs
-        else:
-            return self.extract_positive_value_queryset(qs) 
+        if not self.request.query_params.get('cf_vendor_name'):
+            qs = self.extract_positive_value_queryset(qs)
+        if self.action == 'list':
+            qs = qs.only(*self.get_serializer_class().get_only_fields(self.request))
+        return qs
 
     def list(self, request):
         """
@@ -1216,6 +1237,40 @@ class InventoryExportViewSet(viewsets.ModelViewSet):
         data['results'] = serializer.data
         return Response(data)
 
+    def get_csv_fields(self):
+        """
+        Return csv columns allowed for the serializer, narrowed by ?fields=.
+        """
+        serializer_fields = getattr(self.get_serializer_class().Meta, 'fields', None)
+        requested = parse_fieldset_param(self.request.query_params.get('fields'))
+        columns = list()
+        for field in Inventory._meta.concrete_fields:
+            if serializer_fields and serializer_fields != '__all__' and field.name not in serializer_fields:
+                continue
+            if requested and field.name not in requested:
+                continue
+            columns.append(field.attname)
+        return columns
+
+    @action(detail=False, url_path='csv', methods=['get'])
+    def csv(self, request):
+        """
+        Stream filtered inventory as csv.
+        """
+        qs = self.filter_queryset(self.get_queryset())
+        fields = self.get_csv_fields()
+        writer = csv.writer(Echo())
+
+        def rows():
+            yield writer.writerow(fields)
+            for row in qs.values_list(*fields).iterator(chunk_size=INVENTORY_EXPORT_CHUNK_SIZE):
+                yield writer.writerow(row)
+
+        file_name = 'Inventory_'+timezone.now().strftime("%Y-%m-%d_%H-%M-%S")+'.csv'
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        return response
+
 
 class InventoryItemEditFilterSet(FilterSet):
     status__in = CharInFilter(field_name='status', lookup_expr='in')
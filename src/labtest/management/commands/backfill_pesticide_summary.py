@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from labtest.models import (LabTest, )
+
+
+class Command(BaseCommand):
+    """
+    Recompute denormalized pesticide summary of all lab tests, migration
+    0011 backfills on deploy, this is for re-runs.
+    """
+    help = 'Backfill LabTest pesticide summary fields.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ('pesticide_summary', 'pesticide_values', 'pesticides_detected')
+        batch = list()
+        count = 0
+        for obj in LabTest.objects.order_by('id').iterator(chunk_size=batch_size):
+            obj.update_pesticide_summary()
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                LabTest.objects.bulk_update(batch, fields)
+                count += len(batch)
+                batch = list()
+        if batch:
+            LabTest.objects.bulk_update(batch, fields)
+            count += len(batch)
+        self.stdout.write(f'Updated pesticide summary of {count} lab tests.')
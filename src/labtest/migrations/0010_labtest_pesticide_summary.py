@@ -0,0 +1,32 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labtest', '0009_auto_20211124_0447'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labtest',
+            name='pesticide_summary',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True, verbose_name='Pesticide Summary'),
+        ),
+        migrations.AddField(
+            model_name='labtest',
+            name='pesticide_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, null=True, size=None),
+        ),
+        migrations.AddField(
+            model_name='labtest',
+            name='pesticides_detected',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), blank=True, null=True, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='labtest',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['pesticide_values'], name='labtest_pesticide_values_gin'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# Frozen copy of LabTest.update_pesticide_summary as of this migration.
+PESTICIDE_SUMMARY_FIELDS = (
+    'Acephate', 'Acequinocyl', 'Acetamiprid', 'Aldicarb', 'Azoxystrobin', 'Bifenazate',
+    'Bifenthrin', 'Boscalid', 'Captan', 'Carbaryl', 'Carbofuran', 'Chlordane',
+    'Chlorfenapyr', 'Chlorpyrifos', 'Chlortraniliprole', 'Clofentazine', 'Coumaphos',
+    'Cyfluthrin', 'Cypermethrin', 'Daminozide', 'Diazinon', 'Dichlorvos', 'Dimethoate',
+    'Dimethomorph', 'Ethoprop', 'Etofenprox', 'Etoxazole', 'Fenhexamid', 'Fenoxycarb',
+    'Fenpyroximate', 'Fipronil', 'Flonicamid', 'Fludoxinil', 'Hexythiazox', 'Imazilil',
+    'Imidacloprid', 'Kresoxim_methyl', 'Malathion', 'Metalaxyl', 'Methiocarb', 'Methomyl',
+    'Mevinphos', 'Myclobutanil', 'Naled', 'Oxamyl', 'Paclobutrazole', 'Parathion_methyl',
+    'Pentachloronitrobenzene', 'Permethrin', 'Phosmet', 'Piperonyl_butoxide', 'Prallethrin',
+    'Propiconazole', 'Propoxur', 'Pyrethrins', 'Pyridaben', 'Spinatoram', 'Spinosad',
+    'Spiromesifen', 'Spirotetramat', 'Spiroxamine', 'Tebuconazole', 'Thiacloprid',
+    'Thiamethoxam', 'Trifloxystrobin',
+)
+
+
+def update_pesticide_summary(obj):
+    results = [getattr(obj, field) for field in PESTICIDE_SUMMARY_FIELDS]
+    obj.pesticide_values = None if None in results else sorted(set(results))
+    obj.pesticides_detected = [
+        field for field, value in zip(PESTICIDE_SUMMARY_FIELDS, results)
+        if value is not None and value != 'ND'
+    ]
+    if obj.pesticide_values == ['ND']:
+        obj.pesticide_summary = 'ND'
+    elif obj.Pesticides and obj.Pesticides.upper() in ('PASS', 'FAIL'):
+        obj.pesticide_summary = obj.Pesticides.upper()
+    else:
+        obj.pesticide_summary = None
+
+
+def forward_func(apps, schema_editor):
+    LabTest = apps.get_model('labtest', 'LabTest')
+    fields = ('pesticide_summary', 'pesticide_values', 'pesticides_detected')
+    batch = list()
+    for obj in LabTest.objects.order_by('id').iterator(chunk_size=500):
+        update_pesticide_summary(obj)
+        batch.append(obj)
+        if len(batch) >= 500:
+            LabTest.objects.bulk_update(batch, fields)
+            batch = list()
+    if batch:
+        LabTest.objects.bulk_update(batch, fields)
+
+def reverse_func(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labtest', '0010_labtest_pesticide_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_func, reverse_code=reverse_func),
+    ]
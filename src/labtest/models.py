@@ -1,6 +1,23 @@
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.postgres.fields import (ArrayField, JSONField,)
+from django.contrib.postgres.indexes import (GinIndex, )
+
+PESTICIDE_SUMMARY_FIELDS = (
+    'Acephate', 'Acequinocyl', 'Acetamiprid', 'Aldicarb', 'Azoxystrobin', 'Bifenazate',
+    'Bifenthrin', 'Boscalid', 'Captan', 'Carbaryl', 'Carbofuran', 'Chlordane',
+    'Chlorfenapyr', 'Chlorpyrifos', 'Chlortraniliprole', 'Clofentazine', 'Coumaphos',
+    'Cyfluthrin', 'Cypermethrin', 'Daminozide', 'Diazinon', 'Dichlorvos', 'Dimethoate',
+    'Dimethomorph', 'Ethoprop', 'Etofenprox', 'Etoxazole', 'Fenhexamid', 'Fenoxycarb',
+    'Fenpyroximate', 'Fipronil', 'Flonicamid', 'Fludoxinil', 'Hexythiazox', 'Imazilil',
+    'Imidacloprid', 'Kresoxim_methyl', 'Malathion', 'Metalaxyl', 'Methiocarb', 'Methomyl',
+    'Mevinphos', 'Myclobutanil', 'Naled', 'Oxamyl', 'Paclobutrazole', 'Parathion_methyl',
+    'Pentachloronitrobenzene', 'Permethrin', 'Phosmet', 'Piperonyl_butoxide', 'Prallethrin',
+    'Propiconazole', 'Propoxur', 'Pyrethrins', 'Pyridaben', 'Spinatoram', 'Spinosad',
+    'Spiromesifen', 'Spirotetramat', 'Spiroxamine', 'Tebuconazole', 'Thiacloprid',
+    'Thiamethoxam', 'Trifloxystrobin',
+)
+
 
 class LabTest(models.Model):
     """
@@ -209,9 +226,44 @@ class LabTest(models.Model):
     two_propanol = models.CharField(_('2-propanol'), blank=True, null=True, max_length=255)
     two_butanol = models.CharField(_('2-butanol'), blank=True, null=True, max_length=255)
     Associated_Vendor = models.CharField(_('Associated_Vendor'), blank=True, null=True, max_length=255)
+    pesticide_summary = models.CharField(_('Pesticide Summary'), blank=True, null=True, max_length=10, db_index=True)
+    pesticide_values = ArrayField(models.CharField(max_length=255), blank=True, null=True)
+    pesticides_detected = ArrayField(models.CharField(max_length=50), blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['pesticide_values'], name='labtest_pesticide_values_gin'),
+        ]
 
     def __str__(self):
         if self.Name:
             return f'{self.Name} ({self.id})'
         else:
             return super().__str__()
+
+    def update_pesticide_summary(self):
+        """
+        Denormalize PESTICIDE_SUMMARY_FIELDS results.
+        pesticide_values holds the distinct results and is None when any
+        result is missing, pesticide_summary is ND when every result is ND,
+        else the PASS/FAIL of Pesticides.
+        """
+        results = [getattr(self, field) for field in PESTICIDE_SUMMARY_FIELDS]
+        self.pesticide_values = None if None in results else sorted(set(results))
+        self.pesticides_detected = [
+            field for field, value in zip(PESTICIDE_SUMMARY_FIELDS, results)
+            if value is not None and value != 'ND'
+        ]
+        if self.pesticide_values == ['ND']:
+            self.pesticide_summary = 'ND'
+        elif self.Pesticides and self.Pesticides.upper() in ('PASS', 'FAIL'):
+            self.pesticide_summary = self.Pesticides.upper()
+        else:
+            self.pesticide_summary = None
+
+    def save(self, *args, **kwargs):
+        self.update_pesticide_summary()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'pesticide_summary', 'pesticide_values', 'pesticides_detected'}
+        super().save(*args, **kwargs)
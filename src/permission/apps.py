@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PermissionConfig(AppConfig):
     name = 'permission'
+
+    def ready(self):
+        from . import signal_handlers
@@ -1,15 +1,15 @@
 from django.db import models
 from rest_framework.utils import model_meta
-from .models import (
-    Permission,
+from .snapshot import (
+    get_permission_snapshot,
+    get_all_perm_set,
 )
 
 class CustomPermissionBackend:
 
     def has_perm(self, user_obj, perm, obj=None):
-        for role in user_obj.internal_roles.all():
-            if role.permissions.filter(id=perm).exists():
-                return True
+        if get_permission_snapshot(user_obj).has_internal_perm(perm):
+            return True
         if not user_obj.is_active or user_obj.is_anonymous or obj is None:
             return False
         if obj:
@@ -42,22 +42,10 @@ class CustomPermissionBackend:
         return set()
 
     def get_license_role_perm(self, user_obj, license_obj):
-        organization_user_role_qs = license_obj.organizationuserrole_set.filter(
-            organization_user__user=user_obj,
-            organization_user__organization=license_obj.organization,
-        )
-        if license_obj.organization.created_by.id == user_obj.id:
+        snapshot = get_permission_snapshot(user_obj)
+        if snapshot.owns_organization(license_obj.organization_id):
             return self.get_all_perm_set()
-        user_perm_set = set()
-        perm_cache_name = '_license_role_perm_cache'
-        for organization_user_role in organization_user_role_qs:
-            if not hasattr(organization_user_role, perm_cache_name):
-                role = organization_user_role.role
-                permissions = role.permissions
-                perms = permissions.all().values_list('id', flat=True)
-                setattr(organization_user_role, perm_cache_name, set(perms))
-            user_perm_set.update(getattr(organization_user_role, perm_cache_name))
-        return user_perm_set
+        return snapshot.get_license_perms(license_obj.id, license_obj.organization_id)
 
     def get_organization_user_perm(self, user_obj, organization_obj):
         if organization_obj.created_by_id == user_obj.id:
@@ -65,7 +53,8 @@ class CustomPermissionBackend:
         return set()
 
     def get_all_perm_set(self):
-        return set(Permission.objects.all().values_list('id', flat=True).order_by())
+        return get_all_perm_set()
+
     def authenticate(self, request, **kwargs):
         return None
 
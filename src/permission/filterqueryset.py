@@ -6,6 +6,7 @@ from django.db.models import Q
 from django.db.models.query import QuerySet
 from django.views.generic import View
 from user.models import (User, )
+from .snapshot import (get_permission_snapshot, )
 
 # from .helpers import (
 #     get_user_owned_profiles_crm_id,
@@ -24,6 +25,10 @@ class filterQuerySet:
         self.request = request
         self.view = view
 
+    @property
+    def snapshot(self):
+        return get_permission_snapshot(self.user)
+
     @classmethod
     def filter_queryset(cls, request, queryset, view):
         return cls.for_user(queryset, request.user, request=request, view=view)
@@ -42,40 +47,37 @@ class filterQuerySet:
 
 
     def brand_organization(self):
-        for role in self.user.internal_roles.all():
-            if role.permissions.filter(id='view_organization').exists():
-                return self.queryset
+        if self.snapshot.has_internal_perm('view_organization'):
+            return self.queryset
         q = Q()
         q |= Q(created_by=self.user)
         q |= Q(organization_user__user=self.user)
         return self.queryset.filter(q).distinct()
 
     def brand_brand(self):
-        for role in self.user.internal_roles.all():
-            if role.permissions.filter(id='view_brand').exists():
-                return self.queryset
+        if self.snapshot.has_internal_perm('view_brand'):
+            return self.queryset
         q = Q()
         q |= Q(organization__created_by=self.user)
         return self.queryset.filter(q).distinct()
 
     def brand_license(self):
         q = Q()
-        for role in self.user.internal_roles.all():
-            if role.permissions.filter(id='view_license').exists():
-                p_cats = list(role.profile_categories.all().values_list('name', flat=True))
-                if 'retail' in p_cats:
-                    p_cats = p_cats + ['storefront', 'delivery']
-                if not role.owned_profiles_only:
-                    q |= Q(profile_category__in=p_cats)
-                else:
-                    q |= Q(
-                        profile_category__in=p_cats,
-                        license_profile__crm_account_owner_email=self.user.email,
-                    )
-                    q |= Q(
-                        profile_category__in=p_cats,
-                        license_profile__crm_vendor_owner_email=self.user.email,
-                    )
+        for role in self.snapshot.get_internal_roles_with_perm('view_license'):
+            p_cats = list(role['profile_categories'])
+            if 'retail' in p_cats:
+                p_cats = p_cats + ['storefront', 'delivery']
+            if not role['owned_profiles_only']:
+                q |= Q(profile_category__in=p_cats)
+            else:
+                q |= Q(
+                    profile_category__in=p_cats,
+                    license_profile__crm_account_owner_email=self.user.email,
+                )
+                q |= Q(
+                    profile_category__in=p_cats,
+                    license_profile__crm_vendor_owner_email=self.user.email,
+                )
         q |= Q(organization__created_by=self.user)
         if self.view and self.view.action == 'list':
             q |= Q(organizationuserrole__organization_user__user=self.user)&Q(organizationuserrole__role__permissions='view_license')
@@ -90,9 +92,8 @@ class filterQuerySet:
         return self.queryset.filter(q).distinct()
 
     def brand_organizationuserinvite(self):
-        for role in self.user.internal_roles.all():
-            if role.permissions.filter(id='view_organization_invite').exists():
-                return self.queryset
+        if self.snapshot.has_internal_perm('view_organization_invite'):
+            return self.queryset
         q = Q()
         q |= Q(organization__created_by=self.user)
         q |= Q(
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models import signals
+from django.apps import apps
+
+from .snapshot import (bump_permission_version, )
+
+
+def bump_permission_version_handler(sender, **kwargs):
+    # Bump after commit so snapshots rebuilt under the new version see the
+    # committed rows.
+    transaction.on_commit(bump_permission_version)
+
+
+# Permission snapshots are built from these models.
+for model in (
+        apps.get_model('permission', 'Permission'),
+        apps.get_model('permission', 'InternalRole'),
+        apps.get_model('brand', 'Organization'),
+        apps.get_model('brand', 'OrganizationRole'),
+        apps.get_model('brand', 'OrganizationUser'),
+        apps.get_model('brand', 'OrganizationUserRole')):
+    signals.post_save.connect(bump_permission_version_handler, sender=model, dispatch_uid=f'bump_permission_version_save_{model.__name__}')
+    signals.post_delete.connect(bump_permission_version_handler, sender=model, dispatch_uid=f'bump_permission_version_delete_{model.__name__}')
+
+for through in (
+        apps.get_model('permission', 'InternalRole').permissions.through,
+        apps.get_model('permission', 'InternalRole').profile_categories.through,
+        apps.get_model('brand', 'OrganizationRole').permissions.through,
+        apps.get_model('brand', 'OrganizationUserRole').licenses.through,
+        apps.get_model('user', 'User').internal_roles.through):
+    signals.m2m_changed.connect(bump_permission_version_handler, sender=through, dispatch_uid=f'bump_permission_version_m2m_{through.__name__}')
@@ -0,0 +1,161 @@
+"""
+Per user permission snapshot.
+
+Internal role and organization role permissions of a user are loaded once,
+cached on the user object for the request and in redis under a global
+permission version that is bumped whenever roles or permissions change.
+"""
+import json
+from django.apps import apps
+
+from core.cache import (get_redis_connection, TTLCache, )
+from core.settings import (PERMISSION_SNAPSHOT_CACHE_TTL, )
+
+PERMISSION_VERSION_KEY = 'permission:version'
+SNAPSHOT_ATTR = '_permission_snapshot'
+ALL_PERMISSIONS_CACHE = TTLCache(maxsize=8, ttl=PERMISSION_SNAPSHOT_CACHE_TTL)
+
+
+def get_permission_version():
+    """
+    Return current permission version, None if redis is unavailable.
+    """
+    try:
+        return int(get_redis_connection().get(PERMISSION_VERSION_KEY) or 0)
+    except Exception as exc:
+        print(exc)
+        return None
+
+
+def bump_permission_version():
+    try:
+        get_redis_connection().incr(PERMISSION_VERSION_KEY)
+    except Exception as exc:
+        print(exc)
+    ALL_PERMISSIONS_CACHE.clear()
+
+
+def get_all_perm_set():
+    """
+    Return set of all permission ids.
+    """
+    version = get_permission_version()
+    perms = ALL_PERMISSIONS_CACHE.get(version) if version is not None else None
+    if perms is None:
+        Permission = apps.get_model('permission', 'Permission')
+        perms = frozenset(Permission.objects.all().values_list('id', flat=True).order_by())
+        if version is not None:
+            ALL_PERMISSIONS_CACHE.set(version, perms)
+    return set(perms)
+
+
+class PermissionSnapshot:
+    """
+    Set based view of a user's internal and organization role permissions.
+    """
+
+    def __init__(self, internal_roles=None, license_roles=None, owned_organizations=None):
+        # {role_id: {'permissions': [...], 'profile_categories': [...], 'owned_profiles_only': bool}}
+        self.internal_roles = internal_roles or dict()
+        # [(license_id, organization_id, permission_id), ...]
+        self.license_roles = license_roles or list()
+        self.owned_organizations = set(owned_organizations or ())
+        self.internal_perms = set()
+        for role in self.internal_roles.values():
+            self.internal_perms.update(role['permissions'])
+        self.license_perms = dict()
+        for license_id, organization_id, perm in self.license_roles:
+            self.license_perms.setdefault((license_id, organization_id), set()).add(perm)
+
+    @classmethod
+    def load(cls, user):
+        """
+        Build snapshot from db.
+        """
+        Organization = apps.get_model('brand', 'Organization')
+        OrganizationUserRole = apps.get_model('brand', 'OrganizationUserRole')
+        internal_roles = dict()
+        for role_id, owned_profiles_only, perm, category in user.internal_roles.values_list(
+                'id', 'owned_profiles_only', 'permissions', 'profile_categories__name').order_by():
+            role = internal_roles.setdefault(role_id, {
+                'permissions': set(),
+                'profile_categories': set(),
+                'owned_profiles_only': owned_profiles_only,
+            })
+            if perm:
+                role['permissions'].add(perm)
+            if category:
+                role['profile_categories'].add(category)
+        for role in internal_roles.values():
+            role['permissions'] = sorted(role['permissions'])
+            role['profile_categories'] = sorted(role['profile_categories'])
+        license_roles = [
+            x for x in OrganizationUserRole.licenses.through.objects.filter(
+                organizationuserrole__organization_user__user=user,
+            ).values_list(
+                'license_id',
+                'organizationuserrole__organization_user__organization_id',
+                'organizationuserrole__role__permissions',
+            ).order_by().distinct()
+            if x[2]
+        ]
+        owned_organizations = list(Organization.objects.filter(created_by=user).values_list('id', flat=True))
+        return cls(internal_roles, license_roles, owned_organizations)
+
+    def to_dict(self):
+        return {
+            'internal_roles': {str(k): v for k, v in self.internal_roles.items()},
+            'license_roles': self.license_roles,
+            'owned_organizations': sorted(self.owned_organizations),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            {int(k): v for k, v in data['internal_roles'].items()},
+            [tuple(x) for x in data['license_roles']],
+            data['owned_organizations'],
+        )
+
+    def has_internal_perm(self, perm):
+        return perm in self.internal_perms
+
+    def get_internal_roles_with_perm(self, perm):
+        return [role for role in self.internal_roles.values() if perm in role['permissions']]
+
+    def get_license_perms(self, license_id, organization_id):
+        return set(self.license_perms.get((license_id, organization_id), ()))
+
+    def owns_organization(self, organization_id):
+        return organization_id in self.owned_organizations
+
+
+def get_permission_snapshot(user):
+    """
+    Return permission snapshot for user, cached for the request and in redis.
+    """
+    snapshot = getattr(user, SNAPSHOT_ATTR, None)
+    if snapshot is not None:
+        return snapshot
+    if not getattr(user, 'pk', None):
+        snapshot = PermissionSnapshot()
+    else:
+        version = get_permission_version()
+        key = f'permission:snapshot:{version}:{user.pk}'
+        snapshot = None
+        if version is not None:
+            try:
+                data = get_redis_connection().get(key)
+                if data:
+                    snapshot = PermissionSnapshot.from_dict(json.loads(data))
+            except Exception as exc:
+                print(exc)
+        if snapshot is None:
+            snapshot = PermissionSnapshot.load(user)
+            if version is not None:
+                try:
+                    get_redis_connection().setex(key, PERMISSION_SNAPSHOT_CACHE_TTL, json.dumps(snapshot.to_dict()))
+                except Exception as exc:
+                    print(exc)
+    setattr(user, SNAPSHOT_ATTR, snapshot)
+    return snapshot
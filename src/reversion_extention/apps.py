@@ -22,6 +22,7 @@ class ReversionExtentionConfig(AppConfig):
                     patch_admin(model, AdminClass=VersionAdmin)
                 
                 self.register_reversion(model)
+                signals.post_init.connect(signal_handlers.post_init_handler, sender=model)
                 signals.pre_save.connect(signal_handlers.pre_save_handler, sender=model)
                 signals.post_save.connect(signal_handlers.post_save_handler, sender=model)
                 signals.post_delete.connect(signal_handlers.post_delete_handler, sender=model)
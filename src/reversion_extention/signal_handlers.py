@@ -1,4 +1,4 @@
-import time
+import copy
 from django.contrib.contenttypes.models import ContentType
 from django.core.serializers import serialize, deserialize
 from django.db import models
@@ -9,8 +9,10 @@ from reversion.models import ObjectDoesNotExist
 
 from .models import ReversionMeta, OldVersion
 from .thread_utils import (
+    initiate_local,
     push_seralized_instances,
-    get_seralized_instances,
+    get_seralized_instances_map,
+    has_seralized_instance,
     get_created_obj_info,
     push_created_obj_info,
     get_deleted_obj_info,
@@ -24,19 +26,64 @@ from  .utils import (
 )
 
 
+SNAPSHOT_ATTR = '_reversion_snapshot'
+
+
+def get_instance_key(model, pk):
+    return (model._meta.label_lower, str(pk))
+
+
+def set_instance_snapshot(sender, instance):
+    if instance.pk is not None and is_active() and not instance.get_deferred_fields():
+        instance.__dict__[SNAPSHOT_ATTR] = [
+            (field.attname, copy.deepcopy(value) if isinstance(value, (list, dict)) else value)
+            for field, value in (
+                (field, instance.__dict__.get(field.attname)) for field in sender._meta.concrete_fields
+            )
+        ]
+
+
+def post_init_handler(sender, instance, **kwargs):
+    """
+    Keep field values of instances loaded inside a revision so pre_save does
+    not have to re-fetch them.
+    """
+    set_instance_snapshot(sender, instance)
+
+
+def get_old_instance(sender, instance):
+    """
+    Return instance as stored in db, built from the load time snapshot when
+    available.
+    """
+    snapshot = instance.__dict__.get(SNAPSHOT_ATTR)
+    if snapshot is not None and not instance._state.adding:
+        return sender.from_db(
+            instance._state.db,
+            [attname for attname, _ in snapshot],
+            [value for _, value in snapshot],
+        )
+    return sender.objects.filter(pk=instance.pk).first()
+
+
 def pre_save_handler(sender, instance, **kwargs):
     if is_active() and is_registered(sender):
         version_options = _get_options(sender)
         if instance.pk:
-            push_seralized_instances(
-                version_options.format,
-                serialize(
-                    version_options.format,
-                    (sender.objects.get(pk=instance.pk),),
-                    fields=version_options.fields,
-                    use_natural_foreign_keys=version_options.use_natural_foreign_keys,
-                ),
-            )
+            key = get_instance_key(sender, instance.pk)
+            if not has_seralized_instance(key):
+                old_instance = get_old_instance(sender, instance)
+                if old_instance is not None:
+                    push_seralized_instances(
+                        version_options.format,
+                        serialize(
+                            version_options.format,
+                            (old_instance,),
+                            fields=version_options.fields,
+                            use_natural_foreign_keys=version_options.use_natural_foreign_keys,
+                        ),
+                        key=key,
+                    )
     for field in instance._meta.fields:
         if isinstance(field, (models.TimeField, models.DateField, models.DateTimeField)):
             val = instance.__dict__[field.name]
@@ -45,9 +92,10 @@ def pre_save_handler(sender, instance, **kwargs):
 
 
 def post_save_handler(sender, instance, created, **kwargs):
+    set_instance_snapshot(sender, instance)
     if created:
         push_created_obj_info(
-            content_type_id=ContentType.objects.get(app_label=sender._meta.app_label, model=sender._meta.model_name).pk,
+            content_type_id=ContentType.objects.get_for_model(sender, for_concrete_model=False).pk,
             object_id=instance.pk,
             verbose_name=str(sender._meta.verbose_name),
             obj_name=str(instance),
@@ -55,7 +103,7 @@ def post_save_handler(sender, instance, created, **kwargs):
 
 def post_delete_handler(sender, instance, **kwrags):
     push_deleted_obj_info(
-        content_type_id=ContentType.objects.get(app_label=sender._meta.app_label, model=sender._meta.model_name).pk,
+        content_type_id=ContentType.objects.get_for_model(sender, for_concrete_model=False).pk,
         object_id=instance.pk,
         verbose_name=str(sender._meta.verbose_name),
         obj_name=str(instance),
@@ -63,13 +111,12 @@ def post_delete_handler(sender, instance, **kwrags):
 
 
 def post_revision_commit_handler(sender, revision , versions, **kwargs ):
-    # time.sleep(10)
     initial_comment = revision.comment
     final_comment = []
-    old_instances_data = tuple(
-        (format, data, list(deserialize(format, data))[0])
-        for format, data in get_seralized_instances()
-    )
+    old_instances_data = get_seralized_instances_map()
+    created_objects = {
+        (x.content_type_id, str(x.object_id)) for x in get_created_obj_info()
+    }
     try:
         reversion_meta = revision.reversion_meta
     except revision.__class__.reversion_meta.RelatedObjectDoesNotExist:
@@ -103,33 +150,32 @@ def post_revision_commit_handler(sender, revision , versions, **kwargs ):
         comment = was_deleted_message.format(obj_title)
         final_comment.append(comment)
 
+    old_versions = []
     for version in versions:
-        new_instance_deserialized = list(deserialize(version.format, version.serialized_data))[0]
         comment = ''
-        for created_obj in get_created_obj_info():
-            if version.content_type_id == created_obj.content_type_id and type(created_obj.object_id)(version.object_id) == created_obj.object_id:
-                obj_title = obj_title_msg.format(
-                    verbose_name=new_instance_deserialized.object._meta.verbose_name.title(),
-                    obj_name=str(new_instance_deserialized.object),
-                )
-                comment = was_created_message.format(obj_title)
-                break
-        else:
-            for old_deserialized_instance_data in old_instances_data:
-                old_deserialized_instance = old_deserialized_instance_data[2]
-                if old_deserialized_instance.object.__class__ == new_instance_deserialized.object.__class__:
-                    if old_deserialized_instance.object.pk == new_instance_deserialized.object.pk:
-                        OldVersion.objects.create(
-                            version=version,
-                            format=old_deserialized_instance_data[0],
-                            serialized_data=old_deserialized_instance_data[1],
-                        )
-                        comment = generate_change_comment(
-                            old_instance_deserialized=old_deserialized_instance,
-                            new_instance_deserialized=new_instance_deserialized
-                        )
-                        break
+        content_type = ContentType.objects.get_for_id(version.content_type_id)
+        key = (f'{content_type.app_label}.{content_type.model}', str(version.object_id))
+        if (version.content_type_id, str(version.object_id)) in created_objects:
+            new_instance_deserialized = next(iter(deserialize(version.format, version.serialized_data)))
+            obj_title = obj_title_msg.format(
+                verbose_name=new_instance_deserialized.object._meta.verbose_name.title(),
+                obj_name=str(new_instance_deserialized.object),
+            )
+            comment = was_created_message.format(obj_title)
+        elif key in old_instances_data:
+            old_format, old_data = old_instances_data[key]
+            old_versions.append(OldVersion(
+                version=version,
+                format=old_format,
+                serialized_data=old_data,
+            ))
+            comment = generate_change_comment(
+                old_instance_deserialized=next(iter(deserialize(old_format, old_data))),
+                new_instance_deserialized=next(iter(deserialize(version.format, version.serialized_data))),
+            )
         final_comment.append(comment)
+    OldVersion.objects.bulk_create(old_versions)
 
     revision.comment = ''.join(final_comment) or initial_comment
-    revision.save()
\ No newline at end of file
+    revision.save()
+    initiate_local()
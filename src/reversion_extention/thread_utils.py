@@ -2,6 +2,7 @@ from collections import namedtuple
 from threading import local
 
 _SeralizedInstances = namedtuple("SeralizedInstances", (
+    "key",
     "format",
     "seralized_data",
 ))
@@ -25,6 +26,7 @@ _local = local()
 
 def initiate_local():
     _local.seralized_instances = ()
+    _local.seralized_instance_keys = set()
     _local.deleted_obj_info = ()
     _local.created_obj_info = ()
 
@@ -34,8 +36,21 @@ def get_seralized_instances():
     else:
         return ()
 
-def push_seralized_instances(format, seralized_data):
+def get_seralized_instances_map():
+    """
+    Return {(model label, pk): (format, seralized_data)}, first pushed wins.
+    """
+    result = dict()
+    for i in getattr(_local, 'seralized_instances', ()):
+        result.setdefault(i.key, (i.format, i.seralized_data))
+    return result
+
+def has_seralized_instance(key):
+    return key in getattr(_local, 'seralized_instance_keys', ())
+
+def push_seralized_instances(format, seralized_data, key=None):
     seralized_instance = _SeralizedInstances(
+        key=key,
         format=format,
         seralized_data=seralized_data,
     )
@@ -43,6 +58,10 @@ def push_seralized_instances(format, seralized_data):
         _local.seralized_instances += (seralized_instance,)
     else:
         _local.seralized_instances = (seralized_instance,)
+    if key is not None:
+        if not hasattr(_local, 'seralized_instance_keys'):
+            _local.seralized_instance_keys = set()
+        _local.seralized_instance_keys.add(key)
 
 
 
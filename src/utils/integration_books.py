@@ -1,7 +1,7 @@
 import queue
 import time
 import math
-from integration.books import (get_books_obj,)
+from integration.books import (get_books_obj, invalidate_books_documents, )
 
 
 def trigger_estimate_update_workflow(books_name):
@@ -73,6 +73,7 @@ def trigger_invoice_update_workflow(books_name):
                 time.sleep(2)
                 item_number = per_page*(page-1)+i+1
                 res = invoice_obj.update_invoice(invoice['invoice_id'], {'id':invoice['invoice_id']}, parameters={})
+                invalidate_books_documents(books_name, 'invoice', [invoice['invoice_id']])
                 if not res.get('code'):
                     print(f"{item_number}/{total}: {invoice['invoice_id']} OK")
                 else: